@@ -1,30 +1,736 @@
 # Dir2CSV.py
 import os
+import re
+import sys
 import csv
 from pathlib import Path
-from typing import List, Dict, Optional
+from typing import List, Dict, Optional, Tuple
 import threading
-from typing import Iterable, Sequence
+import multiprocessing
+from collections import deque
+from itertools import islice
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import BinaryIO, Callable, Iterable, Iterator, Sequence, NamedTuple, Union
+import codecs
+import io
+import hashlib
+import json
+import sqlite3
+import logging
+import time
+import heapq
+import importlib
+from array import array
+from contextlib import ExitStack, contextmanager, nullcontext
+
+logger = logging.getLogger("Dir2CSV")
 
 TO_Scan_Ordner = ""  # (kept for compatibility; not used directly)
 CSV_AUSGABE_DATEI = "scanresult.csv"
 
 # === Optional imports for PDF/DOCX text extraction ===
-try:
-    import PyPDF2  # Fast and robust for many PDFs
-except Exception:
-    PyPDF2 = None
+# Imported on first use only, so scans without PDFs/DOCX (and the CLI's
+# start-up) do not pay for loading PyPDF2, pdfminer.six or python-docx.
+_optional_modules = {}
+_optional_modules_lock = threading.Lock()
+
+
+def _optional_import(module_name: str):
+    """
+    Import a module on first use; returns None if it is not installed.
+    """
+    with _optional_modules_lock:
+        if module_name not in _optional_modules:
+            try:
+                _optional_modules[module_name] = importlib.import_module(module_name)
+            except Exception:
+                _optional_modules[module_name] = None
+        return _optional_modules[module_name]
+
+
+# Bytes counted as printable by is_probably_text (ASCII 32-126, tab, LF, CR)
+_TEXT_BYTES = bytes(range(32, 127)) + b'\t\n\r'
+
+# Byte-order marks checked before any encoding guess (UTF-32 before UTF-16,
+# since the UTF-32-LE mark starts with the UTF-16-LE one)
+_BOMS = (
+    (codecs.BOM_UTF8, 'utf-8'),
+    (codecs.BOM_UTF32_LE, 'utf-32-le'),
+    (codecs.BOM_UTF32_BE, 'utf-32-be'),
+    (codecs.BOM_UTF16_LE, 'utf-16-le'),
+    (codecs.BOM_UTF16_BE, 'utf-16-be'),
+)
+
+
+# -----------------------------------------------------------------------------
+# _decode
+# Purpose: bytes.decode, or an incremental decode that leaves an incomplete
+#          trailing character out when the buffer was cut (final=False).
+# -----------------------------------------------------------------------------
+def _decode(data: bytes, encoding: str, final: bool = True) -> str:
+    if final:
+        return data.decode(encoding)
+    return codecs.getincrementaldecoder(encoding)().decode(data, final=False)
+
+
+# -----------------------------------------------------------------------------
+# ScanJob
+# Purpose: One walked file on its way to a CSV row. `cached` holds the row
+#          from the manifest when the file is unchanged since the last scan;
+#          `digest` is the content hash once it had to be computed;
+#          `duplicate_of` names the first file with identical bytes (dedup).
+# -----------------------------------------------------------------------------
+class ScanJob(NamedTuple):
+    path: Path
+    entry: os.DirEntry
+    excluded: bool
+    cached: Optional[Dict] = None
+    digest: Optional[str] = None
+    duplicate_of: Optional[str] = None
+
+
+# -----------------------------------------------------------------------------
+# hash_file
+# Purpose: SHA-256 of a file's bytes, read in chunks.
+# -----------------------------------------------------------------------------
+def hash_file(file_path: Path) -> str:
+    with open(file_path, 'rb') as f:
+        return hashlib.file_digest(f, 'sha256').hexdigest()
+
+
+# -----------------------------------------------------------------------------
+# default_manifest_path
+# Purpose: Location of the incremental-scan manifest next to an output file.
+# -----------------------------------------------------------------------------
+def default_manifest_path(output_file: str) -> str:
+    return str(output_file) + '.manifest.sqlite'
+
+
+# -----------------------------------------------------------------------------
+# default_checkpoint_path
+# Purpose: Location of the resume checkpoint next to an output file.
+# -----------------------------------------------------------------------------
+def default_checkpoint_path(output_file: str) -> str:
+    return str(output_file) + '.checkpoint.json'
+
+
+# -----------------------------------------------------------------------------
+# own_output_paths
+# Purpose: Absolute paths written for the given outputs: each file plus its
+#          temp file (.tmp) and SQLite journal siblings.
+# -----------------------------------------------------------------------------
+def own_output_paths(*output_files: Optional[str]) -> set:
+    paths = set()
+    for output_file in filter(None, output_files):
+        path = str(Path(output_file).resolve())
+        paths.update(Path(path + suffix) for suffix in ('', '.tmp', '-journal', '-wal', '-shm'))
+    return paths
+
+
+# -----------------------------------------------------------------------------
+# walk_key
+# Purpose: Sort key that reproduces walk_files order for a path below the
+#          scan root: in every folder its files (0, name) come before its
+#          sub-folders (1, name), each sorted by name.
+# -----------------------------------------------------------------------------
+def walk_key(parts: Sequence[str]) -> tuple:
+    return tuple((1, p) for p in parts[:-1]) + ((0, parts[-1]),)
+
+
+# -----------------------------------------------------------------------------
+# Class: ScanCheckpoint
+# Purpose: Small JSON file recording how far a CSV scan got: root index,
+#          last completely written file, row count and the CSV byte offset
+#          after its rows. Written atomically (temp file, fsync, replace),
+#          always after the CSV itself was fsync'ed up to that offset.
+# -----------------------------------------------------------------------------
+class ScanCheckpoint:
+    """
+    Durable resume point of a streamed CSV scan.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+
+    def load(self) -> Optional[Dict]:
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return None
+
+    def save(self, state: Dict):
+        tmp = self.path + '.tmp'
+        with open(tmp, 'w', encoding='utf-8') as f:
+            json.dump(state, f)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, self.path)
+
+    def clear(self):
+        for path in (self.path, self.path + '.tmp'):
+            if os.path.exists(path):
+                os.remove(path)
+
+
+# -----------------------------------------------------------------------------
+# Class: ScanManifest
+# Purpose: Persistent SQLite sidecar keyed by relative path that remembers
+#          size, mtime, content hash and the finished row of every file.
+#          A rescan reuses the row when size+mtime match, or when only the
+#          mtime changed but the content hash is the same.
+# -----------------------------------------------------------------------------
+class ScanManifest:
+    """
+    Sidecar store that lets a rescan skip extraction for unchanged files.
+    """
+
+    def __init__(self, path: str, config_fingerprint: str, root_name: str = ''):
+        self.path = path
+        # Several roots may share one manifest; only prune below our own root
+        self.prefix = str(Path(root_name)) + os.sep if root_name else ''
+        self.conn = sqlite3.connect(path)
+        self.conn.execute("CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT)")
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS files ("
+            " relative_path TEXT PRIMARY KEY, size INTEGER, mtime_ns INTEGER,"
+            " content_hash TEXT, row TEXT, run INTEGER)"
+        )
+
+        # Rows built with different settings are not reusable
+        if self._get_meta('config') != config_fingerprint:
+            self.conn.execute("DELETE FROM files")
+            self._set_meta('config', config_fingerprint)
+
+        self.run = int(self._get_meta('run') or 0) + 1
+        self._set_meta('run', str(self.run))
+
+    def _get_meta(self, key: str) -> Optional[str]:
+        row = self.conn.execute("SELECT value FROM meta WHERE key = ?", (key,)).fetchone()
+        return row[0] if row else None
+
+    def _set_meta(self, key: str, value: str):
+        self.conn.execute("INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)", (key, value))
+
+    # -------------------------------------------------------------------------
+    # lookup
+    # Purpose: Return the job with `cached` set if the stored row is still valid.
+    # -------------------------------------------------------------------------
+    def lookup(self, job: ScanJob, relative_path: str) -> ScanJob:
+        record = self.conn.execute(
+            "SELECT size, mtime_ns, content_hash, row FROM files WHERE relative_path = ?",
+            (relative_path,)
+        ).fetchone()
+        if record is None:
+            return job
+
+        size, mtime_ns, content_hash, row = record
+        st = job.entry.stat()
+        if st.st_size != size:
+            return job
+
+        if st.st_mtime_ns != mtime_ns:
+            # Touched but possibly unchanged: compare content hashes
+            try:
+                digest = hash_file(job.path)
+            except OSError:
+                return job
+            if digest != content_hash:
+                return job._replace(digest=digest)
+            self.conn.execute(
+                "UPDATE files SET mtime_ns = ? WHERE relative_path = ?",
+                (st.st_mtime_ns, relative_path)
+            )
+
+        self.conn.execute("UPDATE files SET run = ? WHERE relative_path = ?", (self.run, relative_path))
+        cached = json.loads(row)
+        cached['mtime'] = st.st_mtime  # may differ when only the file was touched
+        return job._replace(cached=cached, digest=content_hash)
+
+    # -------------------------------------------------------------------------
+    # store
+    # Purpose: Remember a freshly extracted row for the next scan.
+    # -------------------------------------------------------------------------
+    def store(self, job: ScanJob, info: Dict):
+        try:
+            st = job.entry.stat()
+            digest = job.digest or hash_file(job.path)
+        except OSError:
+            return
+        self.conn.execute(
+            "INSERT OR REPLACE INTO files (relative_path, size, mtime_ns, content_hash, row, run)"
+            " VALUES (?, ?, ?, ?, ?, ?)",
+            (info['relative_path'], st.st_size, st.st_mtime_ns, digest, json.dumps(info), self.run)
+        )
+
+    # -------------------------------------------------------------------------
+    # remove_unseen
+    # Purpose: After a complete scan, drop entries of files that no longer exist.
+    # Returns: Number of removed entries.
+    # -------------------------------------------------------------------------
+    def remove_unseen(self) -> int:
+        return self.conn.execute(
+            "DELETE FROM files WHERE run != ? AND substr(relative_path, 1, ?) = ?",
+            (self.run, len(self.prefix), self.prefix)
+        ).rowcount
+
+    def close(self):
+        self.conn.commit()
+        self.conn.close()
+
+
+# -----------------------------------------------------------------------------
+# _open_binary
+# Purpose: Open a Path for binary reading, or use an already open binary
+#          stream (archive members) as is, without closing it.
+# -----------------------------------------------------------------------------
+def _open_binary(source: Union[Path, BinaryIO]):
+    if hasattr(source, 'read'):
+        return nullcontext(source)
+    return open(source, 'rb')
+
+
+# -----------------------------------------------------------------------------
+# Archives
+# Purpose: Recognize archive names and list their members without
+#          extracting anything to disk.
+# -----------------------------------------------------------------------------
+_TAR_SUFFIXES = ('.tar', '.tar.gz', '.tgz', '.tar.bz2', '.tbz2', '.tar.xz', '.txz')
+_ZIP_SUFFIXES = ('.zip', '.jar', '.war', '.ear')
+
+
+def archive_kind(name: str) -> Optional[str]:
+    lower = name.lower()
+    if lower.endswith(_TAR_SUFFIXES):
+        return 'tar'
+    if lower.endswith(_ZIP_SUFFIXES):
+        return 'zip'
+    if lower.endswith('.gz'):
+        return 'gz'
+    return None
+
+
+# -----------------------------------------------------------------------------
+# _archive_members
+# Purpose: Yield (member path, size or None, mtime or None, opener) for the
+#          regular files of an archive, in archive order. `opener()` returns
+#          a binary stream of the member. A plain .gz holds one member named
+#          like the file without .gz.
+# -----------------------------------------------------------------------------
+def _archive_members(source: Union[Path, BinaryIO], archive_name: str):
+    kind = archive_kind(archive_name)
+    if kind == 'zip':
+        import zipfile
+        with zipfile.ZipFile(source) as archive:
+            for member in archive.infolist():
+                if not member.is_dir():
+                    yield (member.filename, member.file_size, time.mktime(member.date_time + (0, 0, -1)),
+                           lambda member=member: archive.open(member))
+    elif kind == 'tar':
+        import tarfile
+        stream = hasattr(source, 'read')
+        with tarfile.open(name=None if stream else source, fileobj=source if stream else None) as archive:
+            for member in archive:
+                if member.isfile():
+                    yield member.name, member.size, member.mtime, lambda member=member: archive.extractfile(member)
+    elif kind == 'gz':
+        import gzip
+        name = archive_name.rsplit('/', 1)[-1][:-3]
+        yield name, None, None, lambda: gzip.open(source)
+
+
+# -----------------------------------------------------------------------------
+# Extractor
+# Purpose: One content extractor. `target` is a callable
+#          (scanner, source) -> str or a lazy "module:function" reference that
+#          is imported on first use. `source` is a Path or a seekable binary
+#          stream. `cost` is a scheduling hint: EXPENSIVE extractors run in
+#          the process pool and under extraction_timeout.
+# -----------------------------------------------------------------------------
+CHEAP, EXPENSIVE = 'cheap', 'expensive'
+
+
+class Extractor(NamedTuple):
+    name: str
+    target: Union[str, Callable]
+    cost: str = CHEAP
+
+    def extract(self, scanner: "FileScanner", source: Union[Path, BinaryIO]) -> str:
+        func = self.target
+        if isinstance(func, str):
+            module_name, _, attr = func.partition(':')
+            module = _optional_import(module_name)
+            if module is None:
+                return f"[Note: extractor '{self.name}' unavailable – module '{module_name}' not installed]"
+            func = getattr(module, attr)
+        return func(scanner, source)
+
+
+# -----------------------------------------------------------------------------
+# Class: ExtractorRegistry
+# Purpose: Map extensions and magic-byte prefixes to extractors. Third-party
+#          packages plug in by calling register() or by exposing an entry
+#          point in the "dir2csv.extractors" group: a function that receives
+#          the registry, e.g.
+#              [project.entry-points."dir2csv.extractors"]
+#              pptx = "my_pkg.dir2csv_plugin:register"
+#          Registered callables must be module-level functions (picklable)
+#          so they also work in the process pool.
+# -----------------------------------------------------------------------------
+class ExtractorRegistry:
+    """
+    Extension / magic-byte based lookup of content extractors.
+    """
+
+    ENTRY_POINT_GROUP = "dir2csv.extractors"
+
+    def __init__(self, load_entry_points: bool = True):
+        self._by_extension = {}
+        self._by_magic = []
+        self._entry_points_pending = load_entry_points
+
+    def __getstate__(self):
+        # Plugins are already loaded (or not wanted) in the copy sent to workers
+        self._load_entry_points()
+        return self.__dict__.copy()
+
+    # -------------------------------------------------------------------------
+    # register
+    # Purpose: Add an extractor for the given extensions and/or magic prefixes.
+    # -------------------------------------------------------------------------
+    def register(
+        self,
+        extensions: Iterable[str],
+        target: Union[str, Callable],
+        cost: str = CHEAP,
+        name: Optional[str] = None,
+        magic: Iterable[bytes] = ()
+    ) -> Extractor:
+        extensions = [e.lower() if e.startswith('.') else '.' + e.lower() for e in extensions]
+        extractor = Extractor(name or (extensions[0].lstrip('.') if extensions else str(target)), target, cost)
+        for ext in extensions:
+            self._by_extension[ext] = extractor
+        for prefix in magic:
+            self._by_magic.append((prefix, extractor))
+        return extractor
+
+    def _load_entry_points(self):
+        if not self._entry_points_pending:
+            return
+        self._entry_points_pending = False
+        from importlib.metadata import entry_points
+        for ep in entry_points(group=self.ENTRY_POINT_GROUP):
+            try:
+                ep.load()(self)
+            except Exception as e:
+                logger.warning("Extractor plugin %s failed to load: %s", ep.name, e)
+
+    def for_extension(self, ext: str) -> Optional[Extractor]:
+        if self._entry_points_pending:
+            self._load_entry_points()
+        return self._by_extension.get(ext)
+
+    def extensions(self) -> set:
+        if self._entry_points_pending:
+            self._load_entry_points()
+        return set(self._by_extension)
+
+    def for_content(self, head: bytes) -> Optional[Extractor]:
+        if self._entry_points_pending:
+            self._load_entry_points()
+        for prefix, extractor in self._by_magic:
+            if head.startswith(prefix):
+                return extractor
+        return None
+
+    # -------------------------------------------------------------------------
+    # describe
+    # Purpose: Stable summary of the registrations (for config fingerprints).
+    # -------------------------------------------------------------------------
+    def describe(self) -> List[str]:
+        if self._entry_points_pending:
+            self._load_entry_points()
+        return sorted(f"{ext}={x.name}/{x.cost}" for ext, x in self._by_extension.items())
+
+
+# -----------------------------------------------------------------------------
+# Ignore files
+# Purpose: Honor .gitignore / .dir2csvignore (in every folder) and
+#          .dockerignore (scan root only). Later names win within a folder,
+#          deeper folders win over their parents.
+# -----------------------------------------------------------------------------
+IGNORE_FILE_NAMES = ('.dockerignore', '.gitignore', '.dir2csvignore')
+ROOT_ONLY_IGNORE_FILES = {'.dockerignore'}
+
+
+# -----------------------------------------------------------------------------
+# _ignore_pattern_regex
+# Purpose: Translate one gitignore glob (already stripped of !, trailing /
+#          and leading /) into a regex body for paths with / separators.
+# Logic: * and ? never cross /, [..] is a character class, a full **
+#        segment spans any number of folders; everything else is literal.
+# -----------------------------------------------------------------------------
+def _ignore_pattern_regex(pattern: str) -> str:
+    out = []
+    i, n = 0, len(pattern)
+    while i < n:
+        c = pattern[i]
+        if c == '*':
+            j = i
+            while j < n and pattern[j] == '*':
+                j += 1
+            whole_segment = j - i == 2 and (i == 0 or pattern[i - 1] == '/') and (j == n or pattern[j] == '/')
+            if whole_segment and j == n:
+                out.append('.*')
+            elif whole_segment:
+                out.append('(?:.*/)?')
+                j += 1
+            else:
+                out.append('[^/]*')
+            i = j
+            continue
+        if c == '?':
+            out.append('[^/]')
+        elif c == '[':
+            j = i + 1
+            if j < n and pattern[j] in '!^':
+                j += 1
+            if j < n and pattern[j] == ']':
+                j += 1
+            j = pattern.find(']', j)
+            if j == -1:
+                out.append(re.escape(c))
+            else:
+                body = pattern[i + 1:j].replace('\\', '\\\\').replace('[', '\\[')
+                if body[0] in '!^':
+                    body = '^/' + body[1:]
+                out.append('[' + body + ']')
+                i = j + 1
+                continue
+        elif c == '\\' and i + 1 < n:
+            out.append(re.escape(pattern[i + 1]))
+            i += 2
+            continue
+        else:
+            out.append(re.escape(c))
+        i += 1
+    return ''.join(out)
+
+
+# -----------------------------------------------------------------------------
+# Class: IgnoreRules
+# Purpose: The compiled patterns of one ignore file.
+# Logic: All rules are folded into one regex of named alternatives, in
+#        reverse order, so a single fullmatch finds the LAST matching rule
+#        (gitignore precedence) and m.lastgroup tells whether it negates.
+#        Directory-only rules (trailing /) are left out of the file regex.
+# -----------------------------------------------------------------------------
+class IgnoreRules:
+    """
+    gitignore-style matcher for paths relative to the ignore file's folder.
+    """
+
+    def __init__(self, lines: Iterable[str], anchored: bool = False):
+        alternatives = []  # (group name, regex, dir_only)
+        self._negated = set()
+        for number, raw in enumerate(lines):
+            line = raw.rstrip('\r\n')
+            if not line or line.startswith('#'):
+                continue
+            while line.endswith(' ') and not line.endswith('\\ '):
+                line = line[:-1]
+            negated = line.startswith('!')
+            if negated:
+                line = line[1:]
+            dir_only = line.endswith('/')
+            line = line.rstrip('/')
+            if not line:
+                continue
+            # A / at the start or in the middle anchors the pattern to this folder
+            rooted = anchored or '/' in line
+            line = line.lstrip('/')
+            regex = ('' if rooted else '(?:.*/)?') + _ignore_pattern_regex(line)
+            name = f"r{number}"
+            if negated:
+                self._negated.add(name)
+            alternatives.append((name, regex, dir_only))
+
+        flags = re.IGNORECASE if os.name == 'nt' else 0
+        self._dirs = self._compile(alternatives, flags)
+        self._files = self._compile([a for a in alternatives if not a[2]], flags)
+
+    @staticmethod
+    def _compile(alternatives, flags):
+        if not alternatives:
+            return None
+        return re.compile('|'.join(f"(?P<{name}>{regex})" for name, regex, _ in reversed(alternatives)), flags)
+
+    @classmethod
+    def from_file(cls, path: Path, anchored: bool = False) -> Optional["IgnoreRules"]:
+        try:
+            with open(path, 'r', encoding='utf-8', errors='replace') as f:
+                rules = cls(f, anchored=anchored)
+        except OSError as e:
+            logger.warning("Could not read ignore file %s: %s", path, e)
+            return None
+        return rules if rules._dirs is not None else None
+
+    # -------------------------------------------------------------------------
+    # match
+    # Returns: True (ignored), False (re-included by a ! rule) or None (no
+    #          rule applies, ask the parent folder's rules).
+    # -------------------------------------------------------------------------
+    def match(self, rel_path: str, is_dir: bool) -> Optional[bool]:
+        regex = self._dirs if is_dir else self._files
+        if regex is None:
+            return None
+        m = regex.fullmatch(rel_path)
+        if m is None:
+            return None
+        return m.lastgroup not in self._negated
+
+
+# -----------------------------------------------------------------------------
+# Class: ScanStats
+# Purpose: Thread-safe per-phase timing and per-extension counters for one
+#          scan (walk, sniff, read, decode, pdf, docx, write), plus the
+#          slowest files. Latencies are kept in compact float arrays.
+# -----------------------------------------------------------------------------
+class ScanStats:
+    """
+    Collects where scan time goes; summarized by to_dict()/to_json().
+    """
+
+    PHASES = ('walk', 'sniff', 'read', 'decode', 'pdf', 'docx', 'write')
+
+    def __init__(self, slowest_n: int = 10):
+        self.slowest_n = slowest_n
+        self.phase_seconds = dict.fromkeys(self.PHASES, 0.0)
+        self.extensions = {}   # ext => {'files': n, 'bytes': n, 'latencies': array('d')}
+        self.slowest = []      # min-heap of (seconds, relative_path)
+        self.started = None
+        self.finished = None
+        self._lock = threading.Lock()
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        del state['_lock']
+        return state
 
-try:
-    # pdfminer.six – more accurate with complex layouts
-    from pdfminer.high_level import extract_text as pdfminer_extract_text
-except Exception:
-    pdfminer_extract_text = None
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._lock = threading.Lock()
 
-try:
-    import docx  # python-docx
-except Exception:
-    docx = None
+    def start(self):
+        # Several roots (or runs) of one scanner add up: keep the first start
+        if self.started is None:
+            self.started = time.perf_counter()
+
+    def finish(self):
+        self.finished = time.perf_counter()
+
+    def add_phase(self, phase: str, seconds: float):
+        with self._lock:
+            self.phase_seconds[phase] = self.phase_seconds.get(phase, 0.0) + seconds
+
+    @contextmanager
+    def phase(self, phase: str):
+        t0 = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add_phase(phase, time.perf_counter() - t0)
+
+    # -------------------------------------------------------------------------
+    # add_file
+    # Purpose: Record one processed file: extension counters and latency.
+    # -------------------------------------------------------------------------
+    def add_file(self, relative_path: str, ext: str, size: int, seconds: float):
+        with self._lock:
+            bucket = self.extensions.get(ext)
+            if bucket is None:
+                bucket = self.extensions[ext] = {'files': 0, 'bytes': 0, 'latencies': array('d')}
+            bucket['files'] += 1
+            bucket['bytes'] += size
+            bucket['latencies'].append(seconds)
+            if len(self.slowest) < self.slowest_n:
+                heapq.heappush(self.slowest, (seconds, relative_path))
+            elif seconds > self.slowest[0][0]:
+                heapq.heapreplace(self.slowest, (seconds, relative_path))
+
+    # -------------------------------------------------------------------------
+    # merge
+    # Purpose: Fold in the stats recorded by a worker process.
+    # -------------------------------------------------------------------------
+    def merge(self, other: "ScanStats"):
+        with self._lock:
+            for phase, seconds in other.phase_seconds.items():
+                self.phase_seconds[phase] = self.phase_seconds.get(phase, 0.0) + seconds
+            for ext, theirs in other.extensions.items():
+                bucket = self.extensions.setdefault(ext, {'files': 0, 'bytes': 0, 'latencies': array('d')})
+                bucket['files'] += theirs['files']
+                bucket['bytes'] += theirs['bytes']
+                bucket['latencies'].extend(theirs['latencies'])
+            for item in other.slowest:
+                if len(self.slowest) < self.slowest_n:
+                    heapq.heappush(self.slowest, item)
+                elif item[0] > self.slowest[0][0]:
+                    heapq.heapreplace(self.slowest, item)
+
+    @staticmethod
+    def _percentile(sorted_values: List[float], pct: float) -> float:
+        if not sorted_values:
+            return 0.0
+        rank = max(0, min(len(sorted_values) - 1, int(round(pct / 100 * len(sorted_values) + 0.5)) - 1))
+        return sorted_values[rank]
+
+    def to_dict(self) -> Dict:
+        end = self.finished if self.finished is not None else time.perf_counter()
+        wall = (end - self.started) if self.started is not None else 0.0
+        files = sum(b['files'] for b in self.extensions.values())
+        total_bytes = sum(b['bytes'] for b in self.extensions.values())
+        per_ext = {}
+        for ext, bucket in sorted(self.extensions.items()):
+            lat = sorted(bucket['latencies'])
+            per_ext[ext or '(none)'] = {
+                'files': bucket['files'],
+                'bytes': bucket['bytes'],
+                'latency_ms': {
+                    'p50': round(self._percentile(lat, 50) * 1000, 3),
+                    'p90': round(self._percentile(lat, 90) * 1000, 3),
+                    'p99': round(self._percentile(lat, 99) * 1000, 3),
+                    'max': round(lat[-1] * 1000, 3) if lat else 0.0,
+                },
+            }
+        return {
+            'wall_seconds': round(wall, 3),
+            'files': files,
+            'bytes': total_bytes,
+            'files_per_second': round(files / wall, 1) if wall else None,
+            'mb_per_second': round(total_bytes / wall / 1e6, 2) if wall else None,
+            'phase_seconds': {k: round(v, 3) for k, v in self.phase_seconds.items()},
+            'extensions': per_ext,
+            'slowest_files': [
+                {'relative_path': path, 'ms': round(sec * 1000, 3)}
+                for sec, path in sorted(self.slowest, reverse=True)
+            ],
+        }
+
+    def to_json(self, indent: Optional[int] = 2) -> str:
+        return json.dumps(self.to_dict(), indent=indent)
+
+    # -------------------------------------------------------------------------
+    # report
+    # Purpose: Short human-readable summary for the log.
+    # -------------------------------------------------------------------------
+    def report(self) -> str:
+        d = self.to_dict()
+        lines = [f"Scanned {d['files']} files, {d['bytes'] / 1e6:.1f} MB in {d['wall_seconds']} s "
+                 f"({d['files_per_second']} files/s, {d['mb_per_second']} MB/s)"]
+        lines.append("Phases: " + ", ".join(f"{k} {v:.3f}s" for k, v in d['phase_seconds'].items()))
+        for item in d['slowest_files']:
+            lines.append(f"  slow: {item['ms']:.1f} ms  {item['relative_path']}")
+        return "\n".join(lines)
 
 
 # -----------------------------------------------------------------------------
@@ -41,7 +747,24 @@ class FileScanner:
     # __init__
     # Purpose: Initialize file-type sets and exclusion rules.
     # -------------------------------------------------------------------------
-    def __init__(self):
+    def __init__(
+        self,
+        prune_excluded_folders: bool = False,
+        workers: int = 1,
+        max_bytes_per_file: Optional[int] = None,
+        max_chars_per_file: Optional[int] = None,
+        extraction_timeout: Optional[float] = None,
+        dedup: bool = False,
+        collect_stats: bool = False,
+        progress_callback: Optional[Callable[[Dict], None]] = None,
+        respect_ignore_files: bool = False,
+        scan_archives: bool = False,
+        max_archive_member_bytes: int = 32 * 1024 * 1024,
+        max_archive_depth: int = 2,
+        sample_threshold: Optional[int] = None,
+        sample_bytes: int = 64 * 1024,
+        sample_middle_chunks: int = 0
+    ):
         # File extensions we are interested in
         self.target_extensions = {
             '.cs', '.xml', '.csproj', '.sln', '.dll',
@@ -70,191 +793,986 @@ class FileScanner:
             # IMPORTANT: do not add .pdf/.docx here because we extract their text
         }
 
+        # File extensions that are never listed at all
+        self.excluded_extensions = set()
+
+        # Probe files with unknown extensions (see should_check_file)
+        self.probe_unknown_files = True
+
+        # Encodings tried (in order) for text without a BOM
+        self.text_encodings = ['utf-8', 'latin-1', 'cp1252']
+
         # Folder names to skip when reading content
         self.excluded_folder_names_for_content = {'.git', 'node_modules', 'venv','.venv', '__pycache__','dist', 'build', 'out', 'target', 'bin', 'obj','Dir2CSV_config'}
 
-        # Optional: content length limit per file (disabled in this version)
-        # self.max_chars_per_file = max_chars_per_file
+        # True  => never descend into excluded folders (their files are not listed)
+        # False => list files in excluded folders but leave their content empty
+        self.prune_excluded_folders = prune_excluded_folders
+
+        # Honor .gitignore / .dockerignore / .dir2csvignore: ignored folders
+        # are never entered and ignored files get no row (see IgnoreRules)
+        self.respect_ignore_files = respect_ignore_files
+
+        # Read .zip/.jar/.tar(.gz)/.gz members in memory as extra rows with
+        # virtual paths (release.zip!/src/app.py). Members above the byte
+        # limit are listed without content; nested archives are opened up to
+        # max_archive_depth levels (1 => only the archives on disk).
+        self.scan_archives = scan_archives
+        self.max_archive_member_bytes = max_archive_member_bytes
+        self.max_archive_depth = max_archive_depth
+
+        # Parallel extraction: workers > 1 enables the thread/process pools.
+        # Extractors marked expensive go to processes, everything else to threads.
+        self.workers = max(1, int(workers))
+
+        # Content extractors by extension / magic bytes (PDF, DOCX, plugins).
+        # Shared default registry; assign an ExtractorRegistry to customize.
+        # Registered extensions are listed like target_extensions (they are
+        # added here, so register plugins before creating the scanner).
+        self.extractors = default_registry
+        self.target_extensions |= self.extractors.extensions()
+
+        # Per-file content budgets (None = unlimited):
+        # - max_bytes_per_file: stop reading text files after this many bytes
+        # - max_chars_per_file: cut extracted text to this many characters
+        # - extraction_timeout: seconds allowed per PDF/DOCX extraction
+        self.max_bytes_per_file = max_bytes_per_file
+        self.max_chars_per_file = max_chars_per_file
+        self.extraction_timeout = extraction_timeout
+
+        # Sampling of huge text files (None = off): files larger than
+        # sample_threshold bytes are memory-mapped and only the first and
+        # last sample_bytes (plus sample_middle_chunks evenly spaced chunks)
+        # are decoded, cut on line boundaries. Unknown files above both the
+        # 10 MB probe limit and sample_threshold are then sampled instead of
+        # skipped; unknown files between the two are still skipped.
+        self.sample_threshold = sample_threshold
+        self.sample_bytes = sample_bytes
+        self.sample_middle_chunks = sample_middle_chunks
+
+        # Content deduplication: byte-identical files are extracted once; later
+        # copies get a reference to the first one. Adds a content_hash column.
+        self.dedup = dedup
+
+        # Instrumentation (see ScanStats); None => no timing overhead
+        self.stats = ScanStats() if collect_stats else None
+
+        # Progress/cancellation for callers running the scan on a worker
+        # thread: progress_callback(info) is called for every finished row,
+        # cancel() stops the scan after the current file.
+        self.progress_callback = progress_callback
+        self.cancel_event = threading.Event()
+
+        # Files that could not be processed at all, summed over every root
+        # and scan of this scanner (like stats)
+        self.failed_files = 0
+
+        # Helper process for expensive extractors under extraction_timeout
+        # outside the process pool (see _run_with_timeout); a helper that
+        # times out is killed and replaced.
+        self._timeout_pool = None
+        self._timeout_lock = threading.Lock()
+
+        # Files never listed: the output being written and its sidecars, so a
+        # scan whose output lies inside the tree does not read itself. Set by
+        # the write_* methods (see own_output_paths).
+        self.skip_paths = set()
+
+    # -------------------------------------------------------------------------
+    # __getstate__
+    # Purpose: Pickle support for the process pool; callbacks and the cancel
+    #          event stay in the parent process.
+    # -------------------------------------------------------------------------
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        state['progress_callback'] = None
+        state['cancel_event'] = None
+        state['_timeout_pool'] = None
+        state['_timeout_lock'] = None
+        state['_first_seen'] = {}  # dedup is decided in the parent
+        return state
+
+    # -------------------------------------------------------------------------
+    # cancel
+    # Purpose: Ask a running scan to stop. Rows already yielded stay valid,
+    #          so writers finish a well-formed partial output. The request
+    #          sticks (also when it comes before the scan starts) until
+    #          cancel_event is cleared for the next run.
+    # -------------------------------------------------------------------------
+    def cancel(self):
+        self.cancel_event.set()
+
+    @property
+    def cancelled(self) -> bool:
+        return self.cancel_event is not None and self.cancel_event.is_set()
+
+    # -------------------------------------------------------------------------
+    # count_files
+    # Purpose: Walk only (no reading) to size up a scan for progress/ETA.
+    # Returns: (number of files that will get a row, their total bytes).
+    # -------------------------------------------------------------------------
+    def count_files(self, start_folder: str) -> Tuple[int, int]:
+        self.start_path = Path(start_folder).resolve()
+        files = total_bytes = 0
+        for file_path, entry, excluded in self.walk_files(self.start_path):
+            if self._wants_file(file_path, entry):
+                files += 1
+                try:
+                    total_bytes += entry.stat().st_size
+                except OSError:
+                    pass
+        return files, total_bytes
 
     # -------------------------------------------------------------------------
     # scan_folder
     # Purpose: Walk through the given folder recursively and collect file info.
     # Returns: List of dictionaries with file metadata and (optional) content.
+    # Note: Materializes the whole result; prefer iter_scan for large trees.
     # -------------------------------------------------------------------------
     def scan_folder(self, start_folder: str) -> List[Dict]:
-        found_files = []
+        found_files = list(self.iter_scan(start_folder))
+        logger.info("Total files found: %d", len(found_files))
+        return found_files
+
+    # -------------------------------------------------------------------------
+    # iter_scan
+    # Purpose: Lazily walk the given folder and yield one file-info dictionary
+    #          per processed file. Only the current file's content is held in
+    #          memory, so it can be piped straight into write_csv.
+    #          With manifest_path, unchanged files are served from the
+    #          manifest of the previous scan instead of being re-extracted.
+    #          resume_after (a relative_path as written to the CSV) skips
+    #          everything up to and including that file in walk order;
+    #          first_seen restores the dedup state of the skipped part.
+    # -------------------------------------------------------------------------
+    def iter_scan(
+        self,
+        start_folder: str,
+        manifest_path: Optional[str] = None,
+        resume_after: Optional[str] = None,
+        first_seen: Optional[Dict[str, str]] = None
+    ) -> Iterator[Dict]:
         self.start_path = Path(start_folder).resolve()  # absolute path for relative computation
 
-        print(f"Scanning folder: {self.start_path}")
+        logger.info("Scanning folder: %s", self.start_path)
+        self.skip_paths |= own_output_paths(manifest_path)
+        if self.stats is not None:
+            self.stats.start()
 
-        for file_path in self.start_path.rglob('*'):
-            if file_path.is_file():
-                ext = file_path.suffix.lower()
-                if ext in self.target_extensions or self.should_check_file(file_path):
-                    info = self.collect_file_info(file_path)
-                    if info:
-                        found_files.append(info)
-                    else:
-                        print(f"******ERROR******* File could not be processed: {file_path}")
+        manifest = (ScanManifest(manifest_path, self._config_fingerprint(), self.start_path.name)
+                    if manifest_path else None)
+        self._first_seen = dict(first_seen or {})  # content hash => relative path of first copy (dedup)
+        resume_key = walk_key(Path(resume_after).parts[1:]) if resume_after else None
+        try:
+            jobs = self._iter_jobs(manifest, resume_key)
+            if self.workers > 1:
+                results = self._collect_parallel(jobs)
+            else:
+                results = ((job, self._immediate_info(job) or self.collect_file_info(job.path, job.excluded, job.entry))
+                           for job in jobs)
 
-        print(f"Total files found: {len(found_files)}")
-        return found_files
+            for job, info in results:
+                if self.cancelled:
+                    break
+                if info:
+                    if self.dedup:
+                        info['content_hash'] = (job.digest or '') if self._is_hashed(job) else ''
+                    if manifest is not None and job.cached is None and job.duplicate_of is None:
+                        manifest.store(job, info)
+                    if self.progress_callback is not None:
+                        self.progress_callback(info)
+                    yield info
+                    if self.scan_archives and not job.excluded and archive_kind(job.path.name):
+                        yield from self.iter_archive(job.path, info['relative_path'])
+                else:
+                    self.failed_files += 1
+                    logger.error("File could not be processed: %s", job.path)
+
+            if self.cancelled:
+                logger.warning("Scan cancelled.")
+            elif manifest is not None and resume_key is None:
+                # Skipped files were not looked up; keep their entries after a resume
+                removed = manifest.remove_unseen()
+                if removed:
+                    logger.info("Manifest: dropped %d deleted file(s)", removed)
+        finally:
+            if self.stats is not None:
+                self.stats.finish()
+            if manifest is not None:
+                manifest.close()
+            self._close_timeout_pool()
 
     # -------------------------------------------------------------------------
-    # should_check_file
-    # Purpose: Decide whether a file without a known extension should be probed.
-    # Logic: Skip huge files and dot/tilde-prefixed names; otherwise check.
+    # _iter_jobs
+    # Purpose: Yield a ScanJob for every walked file that will get a row,
+    #          attaching the manifest's cached row when the file is unchanged.
     # -------------------------------------------------------------------------
-    def should_check_file(self, file_path: Path) -> bool:
-        ext = file_path.suffix.lower()
-        if not ext or ext not in self.target_extensions:
+    def _iter_jobs(self, manifest: Optional["ScanManifest"] = None,
+                   resume_key: Optional[tuple] = None) -> Iterator["ScanJob"]:
+        for file_path, entry, excluded in self.walk_files(self.start_path, resume_key):
+            if self._wants_file(file_path, entry):
+                job = ScanJob(file_path, entry, excluded)
+                if manifest is not None:
+                    job = manifest.lookup(job, self._relative_path(file_path))
+                if self.dedup:
+                    job = self._check_duplicate(job)
+                yield job
+
+    # -------------------------------------------------------------------------
+    # _check_duplicate
+    # Purpose: Hash the bytes of a file whose content will be extracted and
+    #          mark it as a duplicate if an identical file was seen earlier.
+    #          Excluded and known-binary files are not hashed.
+    # -------------------------------------------------------------------------
+    def _check_duplicate(self, job: "ScanJob") -> "ScanJob":
+        if not self._is_hashed(job):
+            return job
+        digest = job.digest
+        if digest is None:
             try:
-                if file_path.stat().st_size > 10 * 1024 * 1024:  # >10MB => skip
-                    return False
-            except:
-                return False
+                digest = hash_file(job.path)
+            except OSError:
+                return job  # collect_file_info will report the read error
+        first = self._first_seen.get(digest)
+        if first is not None:
+            return job._replace(cached=None, digest=digest, duplicate_of=first)
+        self._first_seen[digest] = self._relative_path(job.path)
+        return job._replace(digest=digest)
 
-            if file_path.name.startswith('.') or file_path.name.startswith('~'):
-                return False
+    def _is_hashed(self, job: "ScanJob") -> bool:
+        return not job.excluded and job.path.suffix.lower() not in self.binary_extensions
 
-            return True
-        return False
+    # -------------------------------------------------------------------------
+    # _immediate_info
+    # Purpose: Row that needs no extraction: the manifest's cached row or a
+    #          reference row for a duplicate. None => extract normally.
+    # -------------------------------------------------------------------------
+    def _immediate_info(self, job: "ScanJob") -> Optional[Dict]:
+        if job.duplicate_of is not None:
+            try:
+                info = self._base_info(job.path, job.entry)
+            except OSError:
+                return None
+            info['content'] = f"[Duplicate of {job.duplicate_of}]"
+            return info
+        return job.cached
 
     # -------------------------------------------------------------------------
-    # collect_file_info
-    # Purpose: Build a dictionary with relative path, name, extension, and
-    #          (if applicable) extracted text content.
+    # _relative_path
+    # Purpose: Path as written to the CSV: scan-root name + path below it.
     # -------------------------------------------------------------------------
-    def collect_file_info(self, file_path: Path) -> Optional[Dict]:
-        try:
-            rel_to_start = file_path.relative_to(self.start_path)
-            relative_path = Path(self.start_path.name) / rel_to_start
+    def _relative_path(self, file_path: Path) -> str:
+        return str(Path(self.start_path.name) / file_path.relative_to(self.start_path))
 
-            ext = file_path.suffix.lower()
-            name = file_path.name
+    # -------------------------------------------------------------------------
+    # _phase
+    # Purpose: Time a block into ScanStats when stats are enabled.
+    # -------------------------------------------------------------------------
+    def _phase(self, phase: str):
+        if self.stats is None:
+            return nullcontext()
+        return self.stats.phase(phase)
 
-            info = {
-                'relative_path': str(relative_path),
-                'file_name': name,
-                'file_extension': ext,
-                'content': ''
-            }
+    # -------------------------------------------------------------------------
+    # _config_fingerprint
+    # Purpose: Summarize every setting that influences row contents, so cached
+    #          rows are discarded when the scanner configuration changes.
+    # -------------------------------------------------------------------------
+    def _config_fingerprint(self) -> str:
+        settings = {
+            'target_extensions': sorted(self.target_extensions),
+            'readable_extensions': sorted(self.readable_extensions),
+            'binary_extensions': sorted(self.binary_extensions),
+            'text_encodings': self.text_encodings,
+            'excluded_extensions': sorted(self.excluded_extensions),
+            'probe_unknown_files': self.probe_unknown_files,
+            'extractors': self.extractors.describe(),
+            'excluded_folder_names_for_content': sorted(self.excluded_folder_names_for_content),
+            'prune_excluded_folders': self.prune_excluded_folders,
+            'respect_ignore_files': self.respect_ignore_files,
+            'scan_archives': self.scan_archives,
+            'max_archive_member_bytes': self.max_archive_member_bytes,
+            'max_archive_depth': self.max_archive_depth,
+            'max_bytes_per_file': self.max_bytes_per_file,
+            'max_chars_per_file': self.max_chars_per_file,
+            'extraction_timeout': self.extraction_timeout,
+            'sample_threshold': self.sample_threshold,
+            'sample_bytes': self.sample_bytes,
+            'sample_middle_chunks': self.sample_middle_chunks,
+            'dedup': self.dedup,
+            'row_format': 2,  # 2: raw content in rows, escaped by the CSV writers
+        }
+        return hashlib.sha256(json.dumps(settings, sort_keys=True).encode('utf-8')).hexdigest()
 
-            if not self.is_in_excluded_folder(file_path):
-                if ext in self.binary_extensions:
-                    info['content'] = '[Binary file – content not readable]'
-                elif ext in self.readable_extensions:
-                    if ext == '.pdf':
-                        text = self.read_pdf(file_path)
-                    elif ext == '.docx':
-                        text = self.read_docx(file_path)
-                    else:
-                        text = self.read_file_content(file_path)
-                    info['content'] = self._csv_safe(text)
+    # -------------------------------------------------------------------------
+    # _collect_parallel
+    # Purpose: Run collect_file_info on a worker pool and yield (job, info)
+    #          in walk order. PDF/DOCX go to a process pool (created on first
+    #          use), plain reads to a thread pool. At most workers * 4 files
+    #          are in flight, so memory stays bounded like the serial path.
+    # -------------------------------------------------------------------------
+    def _collect_parallel(self, jobs: Iterable["ScanJob"]) -> Iterator[Tuple["ScanJob", Optional[Dict]]]:
+        # Imported here: the process-pool machinery is slow to import and
+        # unused by serial scans
+        from concurrent.futures import ProcessPoolExecutor
+        from concurrent.futures import TimeoutError as FutureTimeout
+        from concurrent.futures.process import BrokenProcessPool
+
+        max_pending = self.workers * 4
+        pending = deque()  # (job, future, runs in the process pool)
+        use_processes = True
+        threads = ThreadPoolExecutor(max_workers=self.workers)
+        processes = None
+
+        def submit_to_processes(job):
+            nonlocal processes
+            if processes is None:
+                processes = ProcessPoolExecutor(
+                    max_workers=self.workers,
+                    mp_context=multiprocessing.get_context("spawn"),
+                    initializer=_init_worker,
+                    initargs=(self,)
+                )
+            # DirEntry does not pickle: the worker stats the file itself
+            future = processes.submit(_collect_in_worker, job.path, job.excluded)
+            future.add_done_callback(self._merge_worker_stats)
+            return future
+
+        # The oldest pending job has had a worker since all jobs before it
+        # finished, so extraction_timeout is counted from the moment we wait.
+        # A worker that overruns it is killed with its pool; the pool's other
+        # unfinished jobs start over in a fresh one.
+        def resolve_next():
+            nonlocal processes
+            job, future, in_process = pending.popleft()
+            if in_process and self.extraction_timeout:
+                try:
+                    future.exception(timeout=self.extraction_timeout)
+                except FutureTimeout:
+                    _kill_pool(processes)
+                    processes = None
+                    for i, (other, other_future, other_in_process) in enumerate(pending):
+                        if other_in_process and (not other_future.done() or other_future.exception() is not None):
+                            pending[i] = (other, submit_to_processes(other), True)
+                    return job, self._timed_out_info(job)
+            return self._resolve(job, future)
+
+        try:
+            for job in jobs:
+                immediate = self._immediate_info(job)
+                in_process = False
+                if immediate is not None:
+                    future = Future()
+                    future.set_result(immediate)
+                elif use_processes and not job.excluded and self._is_expensive(job.path):
+                    try:
+                        future = submit_to_processes(job)
+                        in_process = True
+                    except BrokenProcessPool as e:
+                        logger.error("Process pool unusable, extracting in threads instead: %s", e)
+                        use_processes = False
+                        future = threads.submit(self.collect_file_info, job.path, job.excluded, job.entry)
                 else:
-                    text = self.read_file_intelligently(file_path)
-                    info['content'] = self._csv_safe(text)
+                    future = threads.submit(self.collect_file_info, job.path, job.excluded, job.entry)
+                pending.append((job, future, in_process))
 
-            print(f"Processed: {name}")
-            return info
+                if len(pending) >= max_pending:
+                    yield resolve_next()
 
-        except Exception as e:
-            print(f"Error processing {file_path}: {e}")
-            return None
+            while pending:
+                yield resolve_next()
+        finally:
+            threads.shutdown(cancel_futures=True)
+            if processes is not None:
+                processes.shutdown(cancel_futures=True)
 
     # -------------------------------------------------------------------------
-    # is_in_excluded_folder
-    # Purpose: Check whether a file is located in a content-excluded directory.
+    # _is_expensive
+    # Purpose: Scheduling hint: does this file's extractor belong in a process?
     # -------------------------------------------------------------------------
-    def is_in_excluded_folder(self, file_path: Path) -> bool:
+    def _is_expensive(self, file_path: Path) -> bool:
+        ext = file_path.suffix.lower()
+        if ext in self.binary_extensions:
+            return False
+        extractor = self.extractors.for_extension(ext)
+        return extractor is not None and extractor.cost == EXPENSIVE
+
+    # -------------------------------------------------------------------------
+    # _resolve
+    # Purpose: Wait for one pooled job; a crashed worker counts as a failed file.
+    # -------------------------------------------------------------------------
+    def _resolve(self, job: "ScanJob", future: Future) -> Tuple["ScanJob", Optional[Dict]]:
+        try:
+            result = future.result()
+        except Exception as e:
+            logger.error("Error processing %s: %s", job.path, e)
+            return job, None
+        if isinstance(result, tuple):  # (info, stats) from a worker process
+            result = result[0]
+        return job, result
+
+    # -------------------------------------------------------------------------
+    # _timed_out_info
+    # Purpose: Row for a file whose extraction in the process pool overran
+    #          extraction_timeout (same marker as _run_with_timeout).
+    # -------------------------------------------------------------------------
+    def _timed_out_info(self, job: "ScanJob") -> Optional[Dict]:
+        try:
+            info = self._base_info(job.path, job.entry)
+        except OSError:
+            return None
+        extractor = self.extractors.for_extension(info['file_extension'])
+        info['content'] = self._timeout_marker(extractor.name.upper())
+        logger.warning("Extraction timed out, worker replaced: %s", job.path)
+        if self.stats is not None:
+            self.stats.add_file(info['relative_path'], info['file_extension'], info['size'], self.extraction_timeout)
+        return info
+
+    # -------------------------------------------------------------------------
+    # _merge_worker_stats
+    # Purpose: Done-callback folding a worker process's stats into ours.
+    # -------------------------------------------------------------------------
+    def _merge_worker_stats(self, future: Future):
+        if self.stats is None or future.cancelled() or future.exception() is not None:
+            return
+        worker_stats = future.result()[1]
+        if worker_stats is not None:
+            self.stats.merge(worker_stats)
+
+    # -------------------------------------------------------------------------
+    # walk_files
+    # Purpose: Depth-first directory walk built on os.scandir. Yields
+    #          (path, DirEntry, excluded) for every regular file, in a stable
+    #          order: files of a folder sorted by name, then its sub-folders.
+    # Logic: Excluded folders are pruned entirely when prune_excluded_folders
+    #        is set; otherwise their files are yielded with excluded=True.
+    #        With respect_ignore_files, each folder's ignore files are
+    #        compiled once when it is entered and passed down the stack;
+    #        ignored entries are dropped before they are stat'ed or entered.
+    #        With resume_key (see walk_key), files up to and including that
+    #        position are skipped and folders entirely before it not entered.
+    #        Symlinked folders are listed but not descended into (like rglob).
+    # -------------------------------------------------------------------------
+    def walk_files(self, start_path: Path, resume_key: Optional[tuple] = None) -> Iterator[Tuple[Path, os.DirEntry, bool]]:
+        # (folder, excluded, path relative to start with trailing /, ignore rules, walk key)
+        return self._walk([(start_path, False, '', (), ())], resume_key)
+
+    # -------------------------------------------------------------------------
+    # _walk
+    # Purpose: walk_files from explicit stack entries, so a sub-folder can be
+    #          walked with the state (exclusion, ignore rules) of its parents.
+    # -------------------------------------------------------------------------
+    def _walk(self, stack: list, resume_key: Optional[tuple] = None) -> Iterator[Tuple[Path, os.DirEntry, bool]]:
+        while stack and not self.cancelled:
+            folder, excluded, rel, rules, key = stack.pop()
+            t0 = time.perf_counter()
+            try:
+                with os.scandir(folder) as it:
+                    entries = sorted(it, key=lambda e: e.name)
+            except OSError as e:
+                logger.warning("Error reading folder %s: %s", folder, e)
+                continue
+
+            if self.respect_ignore_files:
+                rules = self._load_ignore_rules(entries, rel, rules)
+
+            files = []
+            sub_folders = []
+            for entry in entries:
+                try:
+                    is_dir = entry.is_dir(follow_symlinks=False)
+                    if rules and self._is_ignored(rules, rel + entry.name, is_dir):
+                        continue
+                    if is_dir:
+                        sub_key = key + ((1, entry.name),)
+                        if resume_key and sub_key < resume_key and resume_key[:len(sub_key)] != sub_key:
+                            continue  # finished before the checkpoint
+                        sub_excluded = excluded or entry.name.lower() in self.excluded_folder_names_for_content
+                        if sub_excluded and self.prune_excluded_folders:
+                            continue
+                        sub_folders.append((Path(entry.path), sub_excluded, rel + entry.name + '/', rules, sub_key))
+                    elif entry.is_file():
+                        if resume_key and key + ((0, entry.name),) <= resume_key:
+                            continue
+                        files.append(entry)
+                except OSError:
+                    continue
+            if self.stats is not None:
+                self.stats.add_phase('walk', time.perf_counter() - t0)
+
+            for entry in files:
+                yield Path(entry.path), entry, excluded
+
+            stack.extend(reversed(sub_folders))
+
+    # -------------------------------------------------------------------------
+    # _load_ignore_rules
+    # Purpose: Extend the inherited rules with the ignore files found among
+    #          a folder's entries, each tagged with its folder prefix.
+    # -------------------------------------------------------------------------
+    def _load_ignore_rules(self, entries: List[os.DirEntry], rel: str, rules: tuple) -> tuple:
+        names = {e.name: e for e in entries}
+        for name in IGNORE_FILE_NAMES:
+            entry = names.get(name)
+            if entry is None or (rel and name in ROOT_ONLY_IGNORE_FILES):
+                continue
+            # .dockerignore patterns are always relative to the build context root
+            compiled = IgnoreRules.from_file(Path(entry.path), anchored=name in ROOT_ONLY_IGNORE_FILES)
+            if compiled is not None:
+                rules = rules + ((rel, compiled),)
+        return rules
+
+    # -------------------------------------------------------------------------
+    # _is_ignored
+    # Purpose: Ask the rules from the deepest folder upwards; the first one
+    #          with a verdict decides.
+    # -------------------------------------------------------------------------
+    @staticmethod
+    def _is_ignored(rules: tuple, rel_path: str, is_dir: bool) -> bool:
+        for prefix, compiled in reversed(rules):
+            verdict = compiled.match(rel_path[len(prefix):], is_dir)
+            if verdict is not None:
+                return verdict
+        return False
+
+    # -------------------------------------------------------------------------
+    # _wants_file
+    # Purpose: Decide whether a walked file gets a row at all.
+    # -------------------------------------------------------------------------
+    def _wants_file(self, file_path: Path, entry: Optional[os.DirEntry] = None) -> bool:
+        if file_path in self.skip_paths:
+            return False
+        ext = file_path.suffix.lower()
+        if ext in self.excluded_extensions:
+            return False
+        if ext in self.target_extensions:
+            return True
+        if self.scan_archives and archive_kind(file_path.name):
+            return True
+        return self.probe_unknown_files and self.should_check_file(file_path, entry)
+
+    # -------------------------------------------------------------------------
+    # should_check_file
+    # Purpose: Decide whether a file without a known extension should be probed.
+    # Logic: Skip huge files (unless they will be sampled) and dot/tilde-
+    #        prefixed names; otherwise check.
+    # -------------------------------------------------------------------------
+    def should_check_file(self, file_path: Path, entry: Optional[os.DirEntry] = None) -> bool:
+        ext = file_path.suffix.lower()
+        if not ext or ext not in self.target_extensions:
+            try:
+                st = entry.stat() if entry is not None else file_path.stat()  # DirEntry caches the stat
+                if st.st_size > 10 * 1024 * 1024 and not self._will_sample(st.st_size):  # >10MB => skip
+                    return False
+            except:
+                return False
+
+            if file_path.name.startswith('.') or file_path.name.startswith('~'):
+                return False
+
+            return True
+        return False
+
+    # -------------------------------------------------------------------------
+    # collect_file_info
+    # Purpose: Build a dictionary with relative path, name, extension, and
+    #          (if applicable) extracted text content.
+    #          `excluded` comes from the walker; None => check the path parts.
+    #          `entry` is the walker's DirEntry, whose cached stat is reused.
+    # -------------------------------------------------------------------------
+    def collect_file_info(self, file_path: Path, excluded: Optional[bool] = None,
+                          entry: Optional[os.DirEntry] = None) -> Optional[Dict]:
+        t0 = time.perf_counter()
+        try:
+            info = self._base_info(file_path, entry)
+            ext = info['file_extension']
+            name = info['file_name']
+
+            if excluded is None:
+                excluded = self.is_in_excluded_folder(file_path)
+
+            if not excluded:
+                info['content'] = self.extract_content(file_path, ext)
+
+            if self.stats is not None:
+                self.stats.add_file(info['relative_path'], ext, info['size'], time.perf_counter() - t0)
+            logger.debug("Processed: %s", name)
+            return info
+
+        except Exception as e:
+            logger.error("Error processing %s: %s", file_path, e)
+            return None
+
+    # -------------------------------------------------------------------------
+    # extract_content
+    # Purpose: Text content of a file or an in-memory archive member
+    #          (`source` is a Path or a seekable binary stream). Rows carry
+    #          the raw text; the CSV writers escape it (see _csv_safe).
+    # Logic: binary placeholder => registered extractor => known text =>
+    #        sniffing for unknown extensions.
+    # -------------------------------------------------------------------------
+    def extract_content(self, source: Union[Path, BinaryIO], ext: str) -> str:
+        if ext in self.binary_extensions:
+            return '[Binary file – content not readable]'
+        extractor = self.extractors.for_extension(ext)
+        if extractor is not None:
+            text = self._run_extractor(extractor, source)
+        elif ext in self.readable_extensions:
+            text = self.read_file_content(source)
+        else:
+            text = self.read_file_intelligently(source)
+        return text or ""
+
+    # -------------------------------------------------------------------------
+    # iter_archive
+    # Purpose: Rows for the members of an archive, read in memory through
+    #          the normal sniffing/extraction path. Nested archives recurse
+    #          while depth < max_archive_depth.
+    # Returns: Iterator of file-info dicts with relative_path set to
+    #          "<archive path>!/<member path>". A damaged archive is logged
+    #          and counted in failed_files; rows already yielded stand.
+    # -------------------------------------------------------------------------
+    def iter_archive(self, source: Union[Path, BinaryIO], virtual_path: str, depth: int = 1) -> Iterator[Dict]:
+        try:
+            for member, size, mtime, opener in _archive_members(source, virtual_path):
+                if self.cancelled:
+                    return
+                yield from self._member_rows(f"{virtual_path}!/{member}", member, size, mtime, opener, depth)
+        except Exception as e:
+            self.failed_files += 1
+            logger.error("Archive could not be read: %s (%s)", virtual_path, e)
+
+    # -------------------------------------------------------------------------
+    # _member_rows
+    # Purpose: Row for one archive member (mirrors _wants_file and
+    #          collect_file_info), followed by its own members if it is an
+    #          archive itself.
+    # -------------------------------------------------------------------------
+    def _member_rows(self, virtual_path: str, member: str, size: Optional[int], mtime: Optional[float],
+                     opener: Callable[[], BinaryIO], depth: int) -> Iterator[Dict]:
+        t0 = time.perf_counter()
+        name = member.rsplit('/', 1)[-1]
+        ext = Path(name).suffix.lower()
+        nested = depth < self.max_archive_depth and archive_kind(name) is not None
+
+        if ext in self.excluded_extensions:
+            return
+        if not (ext in self.target_extensions or nested or
+                (self.probe_unknown_files and not name.startswith(('.', '~')))):
+            return
+        excluded = any(part.lower() in self.excluded_folder_names_for_content for part in member.split('/')[:-1])
+        if excluded and self.prune_excluded_folders:
+            return
+
+        info = {
+            'relative_path': virtual_path,
+            'file_name': name,
+            'file_extension': ext,
+            'content': '',
+            'size': size,
+            'mtime': mtime
+        }
+        if self.dedup:
+            info['content_hash'] = ''
+        data = None
+        if not excluded:
+            limit = self.max_archive_member_bytes
+            if size is None or size <= limit:
+                with self._phase('read'), opener() as stream:
+                    data = stream.read(limit + 1)  # declared sizes can lie
+                if len(data) > limit:
+                    data = None
+                else:
+                    info['size'] = len(data)
+            if data is None:
+                info['content'] = f"[Archive member larger than {limit} bytes – content not read]"
+            elif self.dedup and ext not in self.binary_extensions:
+                digest = hashlib.sha256(data).hexdigest()
+                first = self._first_seen.setdefault(digest, virtual_path)
+                info['content_hash'] = digest
+                if first != virtual_path:
+                    info['content'] = f"[Duplicate of {first}]"
+            if data is not None and not info['content']:
+                info['content'] = self.extract_content(io.BytesIO(data), ext)
+
+        if self.stats is not None:
+            self.stats.add_file(virtual_path, ext, info['size'] or 0, time.perf_counter() - t0)
+        logger.debug("Processed: %s", virtual_path)
+        yield info
+        if nested and data is not None:
+            yield from self.iter_archive(io.BytesIO(data), virtual_path, depth + 1)
+
+    # -------------------------------------------------------------------------
+    # _base_info
+    # Purpose: Row metadata without content (size/mtime are not CSV columns;
+    #          they are used by the other outputs).
+    # -------------------------------------------------------------------------
+    def _base_info(self, file_path: Path, entry: Optional[os.DirEntry] = None) -> Dict:
+        st = (entry if entry is not None else file_path).stat()  # DirEntry caches the stat
+        return {
+            'relative_path': self._relative_path(file_path),
+            'file_name': file_path.name,
+            'file_extension': file_path.suffix.lower(),
+            'content': '',
+            'size': st.st_size,
+            'mtime': st.st_mtime
+        }
+
+    # -------------------------------------------------------------------------
+    # is_in_excluded_folder
+    # Purpose: Check whether a file is located in a content-excluded directory.
+    # -------------------------------------------------------------------------
+    def is_in_excluded_folder(self, file_path: Path) -> bool:
         #for _triple in self.excluded_folder_names_for_content:
         #    if str(file_path).lower().index(_triple.lower()) >= 0:
         #        return True
         #return False
         for part in file_path.parts:
             if part.lower() in self.excluded_folder_names_for_content:
-                print(f"++is_in_excluded_folder : {file_path} return TRUE -> Bleibt Leer")
                 return True
-        print(f"++is_in_excluded_folder : {file_path} return False -> wird auf Text geprüft")
         return False
 
     # -------------------------------------------------------------------------
     # read_file_intelligently
     # Purpose: Heuristically detect if a file is text; if so, read as text,
     #          otherwise mark as binary-like content.
+    # Logic: One open: sniff the first 1 KB, then read the rest from the same
+    #        handle only if it looks like text. Content recognized by a
+    #        registered extractor's magic bytes (e.g. %PDF-) goes to it.
     # -------------------------------------------------------------------------
-    def read_file_intelligently(self, file_path: Path) -> str:
+    def read_file_intelligently(self, file_path: Union[Path, BinaryIO]) -> str:
         try:
-            with open(file_path, 'rb') as f:
-                first_bytes = f.read(1024)
-            if self.is_probably_text(first_bytes):
-                return self.read_file_content(file_path)
-            else:
-                return '[Binary-like file detected – content not readable]'
+            with _open_binary(file_path) as f:
+                with self._phase('sniff'):
+                    first_bytes = f.read(1024)
+                    extractor = self.extractors.for_content(first_bytes)
+                    looks_like_text = extractor is None and self.is_probably_text(first_bytes)
+                if extractor is not None:
+                    f.seek(0)
+                    return self._run_extractor(extractor, f)
+                if not looks_like_text:
+                    return '[Binary-like file detected – content not readable]'
+                size = self._sampling_size(f, first_bytes)
+                if size:
+                    return self._read_sampled(f, size)
+                with self._phase('read'):
+                    data = first_bytes + self._read_limited(f, len(first_bytes))
+            return self._decode_limited(data)
         except Exception as e:
             return f"[Error during intelligent read: {e}]"
 
     # -------------------------------------------------------------------------
     # is_probably_text
     # Purpose: Simple heuristic to check if a byte buffer looks like text.
+    # Logic: bytes.translate deletes all printable ASCII/whitespace bytes at C
+    #        speed; what remains is the non-printable count.
     # -------------------------------------------------------------------------
     def is_probably_text(self, byte_data: bytes) -> bool:
         if not byte_data:
             return False
         if b'\x00' in byte_data:
             return False
-        printable = 0
-        for b in byte_data:
-            if 32 <= b <= 126 or b in [9, 10, 13]:
-                printable += 1
-        ratio = printable / len(byte_data)
+        non_printable = len(byte_data.translate(None, _TEXT_BYTES))
+        ratio = (len(byte_data) - non_printable) / len(byte_data)
         return ratio >= 0.8
 
     # -------------------------------------------------------------------------
     # read_file_content
-    # Purpose: Try multiple encodings to read a text file and return its content.
+    # Purpose: Read a text file (or binary stream) in one go and decode it
+    #          (see decode_text).
+    # -------------------------------------------------------------------------
+    def read_file_content(self, file_path: Union[Path, BinaryIO]) -> str:
+        try:
+            with _open_binary(file_path) as f:
+                size = self._sampling_size(f)
+                if size:
+                    return self._read_sampled(f, size)
+                with self._phase('read'):
+                    data = self._read_limited(f)
+        except Exception as e:
+            return f"[Error reading file: {e}]"
+        return self._decode_limited(data)
+
+    # -------------------------------------------------------------------------
+    # _will_sample
+    # Purpose: Is a file of this size above the sampling threshold?
+    # -------------------------------------------------------------------------
+    def _will_sample(self, size: int) -> bool:
+        return (self.sample_threshold is not None and size > self.sample_threshold
+                and size > 2 * self.sample_bytes)
+
+    # -------------------------------------------------------------------------
+    # _sampling_size
+    # Purpose: Size of an open file if it is to be sampled, else None.
+    #          In-memory streams (archive members) are never sampled, nor are
+    #          UTF-16/32 files, where a line break is not a single byte.
+    # -------------------------------------------------------------------------
+    def _sampling_size(self, f, head: bytes = b'') -> Optional[int]:
+        if self.sample_threshold is None:
+            return None
+        try:
+            size = os.fstat(f.fileno()).st_size
+        except (OSError, AttributeError, io.UnsupportedOperation):
+            return None
+        if not self._will_sample(size):
+            return None
+        if not head:
+            head = f.read(4)
+            f.seek(0)
+        if any(head.startswith(bom) for bom, enc in _BOMS if enc != 'utf-8'):
+            return None
+        return size
+
     # -------------------------------------------------------------------------
-    def read_file_content(self, file_path: Path) -> str:
-        encodings = ['utf-8', 'utf-8-sig', 'latin-1', 'cp1252']
-        for enc in encodings:
+    # _read_sampled
+    # Purpose: Representative excerpt of a huge text file: head, optional
+    #          evenly spaced middle chunks and tail, each cut to whole lines,
+    #          framed by markers that say what was left out.
+    # Logic: The file is memory-mapped and only the sampled slices are
+    #        copied, so time and memory do not grow with the file size.
+    #        Falls back to seek/read where mmap is unavailable.
+    # -------------------------------------------------------------------------
+    def _read_sampled(self, f, size: int) -> str:
+        n = self.sample_bytes
+        chunks = max(0, self.sample_middle_chunks)
+        # (start, end, cut a partial first line, cut a partial last line)
+        spans = [(0, n, False, True)]
+        for i in range(1, chunks + 1):
+            middle = size * i // (chunks + 1)
+            spans.append((max(n, middle - n // 2), min(size - n, middle + n // 2), True, True))
+        spans.append((size - n, size, True, False))
+
+        with self._phase('read'):
             try:
-                with open(file_path, 'r', encoding=enc, errors='strict') as f:
-                    text = f.read()
-                    return self._truncate(text)
-            except UnicodeDecodeError:
-                continue
-            except Exception as e:
-                return f"[Error reading file: {e}]"
-        return "[Error: Could not read file due to encoding issues]"
+                import mmap
+                with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                    raw = [mm[start:end] for start, end, _, _ in spans]
+            except (OSError, ValueError):
+                raw = []
+                for start, end, _, _ in spans:
+                    f.seek(start)
+                    raw.append(f.read(end - start))
+
+        parts = []
+        position = 0
+        for (start, end, cut_head, cut_tail), data in zip(spans, raw):
+            if cut_head and start > 0:
+                newline = data.find(b'\n')
+                if newline != -1:
+                    start += newline + 1
+                    data = data[newline + 1:]
+            if cut_tail and end < size:
+                newline = data.rfind(b'\n')
+                if newline != -1:
+                    data = data[:newline + 1]
+            if start < position:  # overlapping spans on a small file
+                data = data[position - start:]
+                start = position
+            if start > position:
+                parts.append(f"\n[...{start - position} bytes skipped...]\n")
+            with self._phase('decode'):
+                parts.append(self.decode_text(data, final=False))
+            position = start + len(data)
+
+        header = (f"[Sampled: first and last {n} bytes"
+                  + (f" and {chunks} middle chunk(s)" if chunks else "")
+                  + f" of {size} bytes, cut on line boundaries]\n")
+        return self._truncate(header + ''.join(parts))
+
+    # -------------------------------------------------------------------------
+    # _read_limited
+    # Purpose: Read the rest of an open file, but never more than
+    #          max_bytes_per_file in total (`already_read` counts bytes taken
+    #          before). One extra byte is read to detect that the cap was hit.
+    # -------------------------------------------------------------------------
+    def _read_limited(self, f, already_read: int = 0) -> bytes:
+        if self.max_bytes_per_file is None:
+            return f.read()
+        return f.read(max(0, self.max_bytes_per_file - already_read) + 1)
+
+    # -------------------------------------------------------------------------
+    # _decode_limited
+    # Purpose: Decode a buffer from _read_limited, dropping the probe byte and
+    #          any multi-byte character cut in half by the byte cap, and add
+    #          a truncation marker when the cap was hit.
+    # -------------------------------------------------------------------------
+    def _decode_limited(self, data: bytes) -> str:
+        limit = self.max_bytes_per_file
+        with self._phase('decode'):
+            if limit is None or len(data) <= limit:
+                return self._truncate(self.decode_text(data))
+            text = self.decode_text(data[:limit], final=False)
+            return self._truncate(text) + f"\n[...truncated after {limit} bytes...]"
+
+    # -------------------------------------------------------------------------
+    # decode_text
+    # Purpose: Decode an in-memory buffer: honor a BOM if present, otherwise
+    #          try the candidate encodings in order. Newlines are normalized
+    #          to \n like a text-mode read would do. final=False tolerates a
+    #          character cut off at the end of the buffer.
+    # -------------------------------------------------------------------------
+    def decode_text(self, data: bytes, final: bool = True) -> str:
+        for bom, enc in _BOMS:
+            if data.startswith(bom):
+                try:
+                    text = _decode(data[len(bom):], enc, final)
+                    break
+                except UnicodeDecodeError:
+                    return "[Error: Could not read file due to encoding issues]"
+        else:
+            for enc in self.text_encodings:
+                try:
+                    text = _decode(data, enc, final)
+                    break
+                except UnicodeDecodeError:
+                    continue
+            else:
+                return "[Error: Could not read file due to encoding issues]"
+
+        if '\r' in text:
+            text = text.replace('\r\n', '\n').replace('\r', '\n')
+        return text
 
     # -------------------------------------------------------------------------
     # read_pdf
     # Purpose: Extract text from a PDF using PyPDF2 (fast) or pdfminer.six (fallback).
     # -------------------------------------------------------------------------
-    def read_pdf(self, file_path: Path) -> str:
+    def read_pdf(self, source: Union[Path, BinaryIO]) -> str:
         """
         Extract text from a PDF file. Tries PyPDF2 first, then pdfminer.six.
         """
+        return self._truncate(self._pdf_text(source))
+
+    # -------------------------------------------------------------------------
+    # _pdf_text
+    # Purpose: Untruncated PDF text from a path or a seekable binary stream.
+    # -------------------------------------------------------------------------
+    def _pdf_text(self, source: Union[Path, BinaryIO]) -> str:
+        PyPDF2 = _optional_import('PyPDF2')  # Fast and robust for many PDFs
+        pdfminer = _optional_import('pdfminer.high_level')  # more accurate with complex layouts
+        is_stream = hasattr(source, 'read')
+
         # 1) PyPDF2 (fast)
         if PyPDF2 is not None:
             try:
                 parts = []
-                with open(file_path, 'rb') as f:
+                with (nullcontext(source) if is_stream else open(source, 'rb')) as f:
                     reader = PyPDF2.PdfReader(f)
                     for page in reader.pages:
                         t = page.extract_text() or ''
                         parts.append(t)
                 text = "\n".join(parts).strip()
                 if text:
-                    return self._truncate(text)
+                    return text
             except Exception:
                 pass  # fall back to pdfminer
 
         # 2) pdfminer.six (more accurate)
-        if pdfminer_extract_text is not None:
+        if pdfminer is not None:
             try:
-                text = pdfminer_extract_text(str(file_path)) or ''
-                return self._truncate(text)
+                if is_stream:
+                    source.seek(0)
+                return pdfminer.extract_text(source if is_stream else str(source)) or ''
             except Exception as e:
                 return f"[PDF read error (pdfminer): {e}]"
 
@@ -264,14 +1782,22 @@ class FileScanner:
     # read_docx
     # Purpose: Extract text from a DOCX file using python-docx.
     # -------------------------------------------------------------------------
-    def read_docx(self, file_path: Path) -> str:
+    def read_docx(self, source: Union[Path, BinaryIO]) -> str:
         """
         Extract text from a DOCX file via python-docx.
         """
+        return self._truncate(self._docx_text(source))
+
+    # -------------------------------------------------------------------------
+    # _docx_text
+    # Purpose: Untruncated DOCX text from a path or a seekable binary stream.
+    # -------------------------------------------------------------------------
+    def _docx_text(self, source: Union[Path, BinaryIO]) -> str:
+        docx = _optional_import('docx')  # python-docx
         if docx is None:
             return "[Note: 'python-docx' not installed. Please run 'pip install python-docx'.]"
         try:
-            d = docx.Document(str(file_path))
+            d = docx.Document(source if hasattr(source, 'read') else str(source))
             parts = []
             # Paragraphs
             for p in d.paragraphs:
@@ -281,68 +1807,1452 @@ class FileScanner:
                 for row in t.rows:
                     for cell in row.cells:
                         parts.append(cell.text)
-            text = "\n".join(parts).strip()
-            return self._truncate(text)
+            return "\n".join(parts).strip()
         except Exception as e:
             return f"[DOCX read error: {e}]"
 
+    # -------------------------------------------------------------------------
+    # _run_extractor
+    # Purpose: Run a registered extractor (under extraction_timeout when it is
+    #          marked expensive), record its phase time and cap its output.
+    # -------------------------------------------------------------------------
+    def _run_extractor(self, extractor: "Extractor", source: Union[Path, BinaryIO]) -> str:
+        with self._phase(extractor.name):
+            if extractor.cost == EXPENSIVE:
+                text = self._run_with_timeout(extractor, source)
+            else:
+                text = extractor.extract(self, source)
+        return self._truncate(text)
+
+    # -------------------------------------------------------------------------
+    # _run_with_timeout
+    # Purpose: Run an expensive extractor under extraction_timeout. It runs in
+    #          a helper process (started once, warmed up outside the clock);
+    #          one that does not finish in time is killed and replaced, and
+    #          the file gets a timeout marker instead.
+    # Note: Process-pool workers run extractors directly: the parent enforces
+    #       the timeout there (see _collect_parallel).
+    # -------------------------------------------------------------------------
+    def _run_with_timeout(self, extractor: "Extractor", source: Union[Path, BinaryIO]) -> str:
+        if not self.extraction_timeout:
+            return extractor.extract(self, source)
+
+        from concurrent.futures import ProcessPoolExecutor
+        from concurrent.futures import TimeoutError as FutureTimeout
+
+        kind = extractor.name.upper()
+        if not isinstance(source, (Path, io.BytesIO)):
+            source = io.BytesIO(source.read())  # archive member streams do not pickle
+        with self._timeout_lock:
+            if self._timeout_pool is None:
+                self._timeout_pool = ProcessPoolExecutor(
+                    max_workers=1,
+                    mp_context=multiprocessing.get_context("spawn"),
+                    initializer=_init_worker,
+                    initargs=(self,)
+                )
+                self._timeout_pool.submit(int).result()  # start-up does not count against the timeout
+            try:
+                return self._timeout_pool.submit(_extract_in_worker, extractor, source).result(
+                    timeout=self.extraction_timeout)
+            except FutureTimeout:
+                _kill_pool(self._timeout_pool)
+                self._timeout_pool = None
+                return self._timeout_marker(kind)
+            except Exception as e:
+                # Helper died (or the extractor does not pickle): start a new one next time
+                _kill_pool(self._timeout_pool)
+                self._timeout_pool = None
+                return f"[{kind} read error: {e}]"
+
+    def _timeout_marker(self, kind: str) -> str:
+        return f"[{kind} extraction timed out after {self.extraction_timeout}s – content not read]"
+
+    def _close_timeout_pool(self):
+        with self._timeout_lock:
+            if self._timeout_pool is not None:
+                self._timeout_pool.shutdown(cancel_futures=True)
+                self._timeout_pool = None
+
     # -------------------------------------------------------------------------
     # _truncate
-    # Purpose: Optionally shorten extracted text to a maximum length.
-    #          (Disabled here but kept for future use.)
+    # Purpose: Shorten extracted text to max_chars_per_file (if set) and mark it.
     # -------------------------------------------------------------------------
     def _truncate(self, text: str) -> str:
         if text is None:
             return ""
-        # if len(text) > self.max_chars_per_file:
-        #     return text[: self.max_chars_per_file] + f"\n[...truncated to {self.max_chars_per_file} chars...]"
+        if self.max_chars_per_file is not None and len(text) > self.max_chars_per_file:
+            return text[: self.max_chars_per_file] + f"\n[...truncated to {self.max_chars_per_file} chars...]"
         return text
 
     # -------------------------------------------------------------------------
-    # _csv_safe
-    # Purpose: Make content safe for CSV (escape quotes, visualize newlines/tabs).
+    # csv_columns
+    # Purpose: Columns of the CSV outputs for the current settings.
     # -------------------------------------------------------------------------
-    def _csv_safe(self, content: str) -> str:
-        if content is None:
-            content = ""
-        # Escape double quotes
-        content = content.replace('"', '""')
-        # Normalize newlines and tabs
-        content = content.replace('\r\n', '\\n').replace('\n', '\\n').replace('\r', '\\n')
-        content = content.replace('\t', '\\t')
-        return content
+    def csv_columns(self) -> List[str]:
+        if self.dedup:
+            return CSV_COLUMNS + ['content_hash']
+        return list(CSV_COLUMNS)
 
     # -------------------------------------------------------------------------
     # create_csv
     # Purpose: Write the collected file info into a semicolon-separated CSV file.
     # -------------------------------------------------------------------------
     def create_csv(self, file_list: List[Dict], output_file: str):
-        if not file_list:
-            print("No files to save.")
-            return
+        try:
+            self.write_csv(file_list, output_file)
+        except Exception as e:
+            logger.error("Error creating CSV: %s", e)
+
+    # -------------------------------------------------------------------------
+    # write_csv
+    # Purpose: Stream file-info rows from any iterable (e.g. iter_scan) into a
+    #          CSV file, writing each row as soon as it is produced. Names
+    #          ending in .gz / .xz / .zip are compressed on the fly.
+    # Returns: Number of rows written. Write errors propagate (create_csv
+    #          keeps the old log-and-continue behavior).
+    # -------------------------------------------------------------------------
+    def write_csv(self, rows: Iterable[Dict], output_file: str) -> int:
+        # Set before the first row is pulled: iter_scan is lazy
+        self.skip_paths = own_output_paths(output_file, default_checkpoint_path(output_file))
+        rows = iter(rows)
+        first = next(rows, None)
+        if first is None:
+            logger.warning("No files to save.")
+            return 0
+
+        with open_csv_output(output_file) as csv_file:
+            writer = _csv_dict_writer(csv_file, self.csv_columns())
+            writer.writeheader()
+            with self._phase('write'):
+                writer.writerow(first)
+            count = 1
+            for info in rows:
+                with self._phase('write'):
+                    writer.writerow(info)
+                count += 1
+
+        logger.info("CSV successfully created: %s", output_file)
+        logger.info("Entry count: %d", count)
+        return count
+
+    # -------------------------------------------------------------------------
+    # write_checkpointed
+    # Purpose: Scan one or more roots into a plain CSV file, recording a
+    #          checkpoint every `interval` seconds so that an interrupted
+    #          run can continue with resume=True instead of starting over.
+    # Logic: A checkpoint is only taken between two walked files (archive
+    #        members belong to their archive): flush + fsync the CSV, then
+    #        atomically replace the checkpoint. Resuming truncates the CSV
+    #        to the recorded offset (dropping any half-written tail), rebuilds
+    #        the dedup state from the rows kept, and walks on after the
+    #        recorded file. The result is byte-identical to an uninterrupted
+    #        run. The checkpoint is removed when the scan completes.
+    # Returns: Number of rows in the CSV.
+    # -------------------------------------------------------------------------
+    def write_checkpointed(
+        self,
+        roots: Sequence[str],
+        output_file: str,
+        manifest_path: Optional[str] = None,
+        resume: bool = False,
+        interval: float = 60.0,
+        checkpoint_path: Optional[str] = None
+    ) -> int:
+        if output_compression(output_file):
+            raise ValueError("Checkpoints need an uncompressed CSV output")
+        checkpoint = ScanCheckpoint(checkpoint_path or default_checkpoint_path(output_file))
+        self.skip_paths = own_output_paths(output_file, checkpoint.path)
+        roots = [str(Path(r).resolve()) for r in roots]
+        base = {'config': self._config_fingerprint(), 'roots': roots, 'output': str(Path(output_file).resolve())}
+
+        state = checkpoint.load() if resume else None
+        if resume and state is None:
+            logger.info("No checkpoint found – starting a full scan.")
+        if state is not None:
+            if any(state.get(k) != v for k, v in base.items()):
+                raise ValueError(f"Checkpoint {checkpoint.path} belongs to a different scan (roots, output or settings changed)")
+            if not os.path.exists(output_file) or os.path.getsize(output_file) < state['offset']:
+                raise ValueError(f"Output {output_file} is shorter than its checkpoint; cannot resume")
+
+        columns = self.csv_columns()
+        if state is None:
+            csv_file = open(output_file, 'w', newline='', encoding='utf-8-sig', buffering=OUTPUT_BUFFER_SIZE)
+            _csv_dict_writer(csv_file, columns).writeheader()
+            count, start_index, resume_after = 0, 0, None
+        else:
+            with open(output_file, 'r+b') as f:
+                f.truncate(state['offset'])
+            count, start_index, resume_after = state['rows'], state['root_index'], state['last_file']
+            logger.info("Resuming after %d rows (%s)", count, resume_after or roots[start_index])
+            # Append mode: the utf-8-sig encoder does not repeat the BOM
+            csv_file = open(output_file, 'a', newline='', encoding='utf-8-sig', buffering=OUTPUT_BUFFER_SIZE)
+
+        def save(root_index: int, last_file: Optional[str]):
+            csv_file.flush()
+            os.fsync(csv_file.fileno())
+            checkpoint.save(dict(base, root_index=root_index, last_file=last_file,
+                                 rows=count, offset=csv_file.buffer.tell()))
+
+        with csv_file:
+            writer = _csv_dict_writer(csv_file, columns)
+            for index in range(start_index, len(roots)):
+                root = roots[index]
+                after = resume_after if index == start_index else None
+                first_seen = self._first_seen_in(output_file, Path(root).name) if after and self.dedup else None
+                save(index, after)
+                last_file = after
+                last_saved = time.monotonic()
+                for info in self.iter_scan(root, manifest_path, resume_after=after, first_seen=first_seen):
+                    path = info['relative_path']
+                    if last_file is None or not path.startswith(last_file + '!/'):
+                        # A new walked file starts: everything before it is complete
+                        if time.monotonic() - last_saved >= interval:
+                            save(index, last_file)
+                            last_saved = time.monotonic()
+                        last_file = path
+                    with self._phase('write'):
+                        writer.writerow(info)
+                    count += 1
+                if self.cancelled:
+                    # The last file's archive members may be cut short; keep the previous checkpoint
+                    logger.warning("Checkpoint kept for --resume: %s", checkpoint.path)
+                    return count
+
+        checkpoint.clear()
+        if count == 0:
+            os.remove(output_file)  # like write_csv: no header-only file
+            logger.warning("No files to save.")
+            return 0
+        logger.info("CSV successfully created: %s", output_file)
+        logger.info("Entry count: %d", count)
+        return count
+
+    # -------------------------------------------------------------------------
+    # _first_seen_in
+    # Purpose: Dedup state (content hash => first relative path) of the rows
+    #          of one root already in a CSV, in file order.
+    # -------------------------------------------------------------------------
+    @staticmethod
+    def _first_seen_in(output_file: str, root_name: str) -> Dict[str, str]:
+        first_seen = {}
+        prefix = root_name + os.sep
+        with open(output_file, 'r', newline='', encoding='utf-8-sig') as f:
+            for row in csv.DictReader(f):
+                digest = row.get('content_hash')
+                if digest and row['relative_path'].startswith(prefix):
+                    first_seen.setdefault(digest, row['relative_path'])
+        return first_seen
+
+    # -------------------------------------------------------------------------
+    # write_sharded
+    # Purpose: Stream rows into numbered CSV shards (name.part001.csv, ...)
+    #          that each stay within a byte and/or estimated-token budget,
+    #          plus name.index.csv mapping every path to its shard(s).
+    # Returns: Number of rows written.
+    # -------------------------------------------------------------------------
+    def write_sharded(
+        self,
+        rows: Iterable[Dict],
+        output_file: str,
+        max_shard_bytes: Optional[int] = None,
+        max_shard_tokens: Optional[int] = None
+    ) -> int:
+        count = 0
+        with ShardedCSVWriter(output_file, max_shard_bytes, max_shard_tokens, self.csv_columns()) as writer:
+            # Shards left by an earlier run and the ones opened below are not input
+            shards = writer.stem.parent.glob(f"{writer.stem.name}.part[0-9][0-9][0-9]{writer.shard_suffix}")
+            self.skip_paths = own_output_paths(writer.index_path, *shards)
+            shard_count = 0
+            for info in rows:
+                with self._phase('write'):
+                    writer.write(info)
+                if writer.shard_count != shard_count:
+                    shard_count = writer.shard_count
+                    self.skip_paths |= own_output_paths(writer.shard_path)
+                count += 1
+        if count == 0:
+            logger.warning("No files to save.")
+            return 0
+
+        logger.info("CSV shards successfully created: %d (index: %s)", writer.shard_count, writer.index_path)
+        logger.info("Entry count: %d", count)
+        return count
+
+    # -------------------------------------------------------------------------
+    # write_output
+    # Purpose: Stream rows into the backend matching the output file name:
+    #          .sqlite/.sqlite3/.db => SQLite database, anything else => CSV
+    #          (compressed for .csv.gz / .csv.xz / .zip).
+    # Returns: Number of rows written.
+    # -------------------------------------------------------------------------
+    def write_output(self, rows: Iterable[Dict], output_file: str) -> int:
+        if Path(output_file).suffix.lower() in SQLITE_SUFFIXES:
+            return self.write_sqlite(rows, output_file)
+        return self.write_csv(rows, output_file)
 
+    # -------------------------------------------------------------------------
+    # write_sqlite
+    # Purpose: Stream rows into a fresh SQLite database in batched
+    #          transactions, then build an FTS5 full-text index on content.
+    # Returns: Number of rows written.
+    # -------------------------------------------------------------------------
+    def write_sqlite(self, rows: Iterable[Dict], db_file: str, batch_size: int = 1000) -> int:
+        self.skip_paths = own_output_paths(db_file)
+        # Like the CSV writer, replace any previous snapshot
+        for leftover in (db_file, db_file + '-journal', db_file + '-wal', db_file + '-shm'):
+            if os.path.exists(leftover):
+                os.remove(leftover)
+
+        count = 0
+        conn = sqlite3.connect(db_file)
+        try:
+            # The snapshot is rebuilt from scratch on failure, so skip durability during the load
+            conn.execute("PRAGMA journal_mode = MEMORY")
+            conn.execute("PRAGMA synchronous = OFF")
+            conn.execute(
+                "CREATE TABLE files ("
+                " id INTEGER PRIMARY KEY, relative_path TEXT NOT NULL UNIQUE, file_name TEXT,"
+                " file_extension TEXT, content TEXT, size INTEGER, mtime REAL, content_hash TEXT)"
+            )
+
+            rows = iter(rows)
+            while True:
+                batch = [_sqlite_values(r) for r in islice(rows, batch_size)]
+                if not batch:
+                    break
+                with self._phase('write'), conn:
+                    conn.executemany("INSERT OR REPLACE" + _SQLITE_INSERT, batch)
+                count += len(batch)
+
+            try:
+                with self._phase('write'), conn:
+                    conn.executescript(_FTS_SCHEMA)
+                    conn.execute("INSERT INTO files_fts (files_fts) VALUES ('rebuild')")
+            except sqlite3.OperationalError as e:
+                logger.warning("Full-text index not created (SQLite without FTS5?): %s", e)
+
+            logger.info("SQLite database successfully created: %s", db_file)
+            logger.info("Entry count: %d", count)
+        finally:
+            conn.close()
+        return count
+
+    # -------------------------------------------------------------------------
+    # watch
+    # Purpose: Keep an output up to date while files change: one full scan,
+    #          then only touched paths are re-collected and applied to the
+    #          output (SQLite: upsert/delete; CSV: streamed merge into a temp
+    #          file + atomic replace, no source file is read again).
+    # Logic: Events come from inotify (Linux) or a directory-mtime poller
+    #        and are batched until `debounce` seconds pass without new ones.
+    #        Changes to ignore files or an inotify queue overflow trigger a
+    #        full rescan. Runs until cancel() or Ctrl+C.
+    # -------------------------------------------------------------------------
+    def watch(
+        self,
+        start_folder: str,
+        output_file: str,
+        manifest_path: Optional[str] = None,
+        debounce: float = 1.0,
+        poll_interval: float = 2.0
+    ):
+        if self.dedup:
+            raise ValueError("Watch mode does not support dedup (first copies change as files change)")
+        if output_compression(output_file):
+            raise ValueError("Watch mode needs a plain CSV or SQLite output")
+        sqlite_output = Path(output_file).suffix.lower() in SQLITE_SUFFIXES
+
+        self.write_output(self.iter_scan(start_folder, manifest_path), output_file)
+        # Our own writes must not count as changes, or every update triggers the next
+        own = own_output_paths(output_file, manifest_path, default_checkpoint_path(output_file))
+        self._watch_rules = {}  # folder => ignore rules, see _folder_rules
+        should_watch = lambda d: self._watch_status(d, True) is not None
+        watcher = open_watcher(self.start_path, should_watch, poll_interval)
+        logger.info("Watching %s (%s) – press Ctrl+C to stop", self.start_path, watcher.kind)
+
+        touched = set()
+        full_rescan = False
+        last_event = 0.0
         try:
-            with open(output_file, 'w', newline='', encoding='utf-8-sig') as csv_file:
-                columns = ['relative_path', 'file_name', 'file_extension', 'content']
-                writer = csv.DictWriter(
-                    csv_file,
-                    fieldnames=columns,
-                    delimiter=',',
-                    quotechar='"',
-                    quoting=csv.QUOTE_ALL
+            while not self.cancelled:
+                paths, overflow = watcher.read(min(debounce, poll_interval) / 2)
+                paths -= own
+                if paths or overflow:
+                    touched |= paths
+                    full_rescan = full_rescan or overflow
+                    last_event = time.monotonic()
+                if not (touched or full_rescan) or time.monotonic() - last_event < debounce:
+                    continue
+
+                batch, touched = touched, set()
+                t0 = time.perf_counter()
+                if full_rescan or any(p.name in IGNORE_FILE_NAMES for p in batch):
+                    logger.info("Full rescan (%s)", "event overflow" if full_rescan else "ignore rules changed")
+                    full_rescan = False
+                    self._watch_rules = {}
+                    # The watched folders follow the new rules (and folders missed in an overflow)
+                    watcher.close()
+                    watcher = open_watcher(self.start_path, should_watch, poll_interval)
+                    self.write_output(self.iter_scan(str(self.start_path), manifest_path), output_file)
+                    continue
+
+                updates, removed = self._collect_changes(batch)
+                if not updates and not removed:
+                    continue
+                with self._phase('write'):
+                    if sqlite_output:
+                        update_sqlite(output_file, updates, removed)
+                    else:
+                        update_csv(output_file, self.csv_columns(), updates, removed)
+                logger.info("Updated %d path(s) in %.3f s", len(updates) + len(removed),
+                            time.perf_counter() - t0)
+        except KeyboardInterrupt:
+            pass
+        finally:
+            watcher.close()
+        logger.info("Watch stopped.")
+
+    # -------------------------------------------------------------------------
+    # _collect_changes
+    # Purpose: Turn a batch of touched paths into output changes.
+    # Returns: (updates, removed): updates maps the relative_path of a
+    #          walked file to its new rows (file row + archive members;
+    #          empty => delete), removed holds relative_path prefixes of
+    #          folders whose rows are dropped (re-created folders are
+    #          walked again and land in updates).
+    # -------------------------------------------------------------------------
+    def _collect_changes(self, touched: Iterable[Path]) -> Tuple[Dict[str, List[Dict]], set]:
+        updates = {}
+        removed = set()
+        for path in sorted(touched):
+            try:
+                parts = path.relative_to(self.start_path).parts
+            except ValueError:
+                continue
+            rel = self._relative_path(path)
+            if path.is_dir() and not path.is_symlink():
+                removed.add(rel + os.sep)
+                status = self._watch_status(path, True)
+                if status is None:
+                    continue
+                excluded, rules, parent_rel = status
+                stack = [(path, excluded, parent_rel + parts[-1] + '/', rules, ())]
+                for file_path, entry, file_excluded in self._walk(stack):
+                    if self._wants_file(file_path, entry):
+                        updates[self._relative_path(file_path)] = self._rows_for(file_path, file_excluded)
+            elif path.is_file():
+                status = self._watch_status(path, False)
+                keep = status is not None and self._wants_file(path)
+                updates[rel] = self._rows_for(path, status[0]) if keep else []
+            else:
+                # Deleted or moved away: a file or a whole folder
+                updates[rel] = []
+                removed.add(rel + os.sep)
+        return updates, removed
+
+    def _rows_for(self, file_path: Path, excluded: bool) -> List[Dict]:
+        info = self.collect_file_info(file_path, excluded)
+        if info is None:
+            return []
+        rows = [info]
+        if self.scan_archives and not excluded and archive_kind(file_path.name):
+            rows.extend(self.iter_archive(file_path, info['relative_path']))
+        return rows
+
+    # -------------------------------------------------------------------------
+    # _watch_status
+    # Purpose: Would walk_files list this path? Applies the same folder
+    #          exclusion, pruning and ignore rules as the walk, top-down.
+    # Returns: None if the path is skipped, else (excluded, ignore rules of
+    #          its folder, folder path relative to the root with trailing /).
+    # -------------------------------------------------------------------------
+    def _watch_status(self, path: Path, is_dir: bool) -> Optional[Tuple[bool, tuple, str]]:
+        parts = path.relative_to(self.start_path).parts
+        if not parts:
+            return False, (), ''
+        excluded = False
+        rel = ''
+        rules = self._folder_rules('')
+        for i, name in enumerate(parts):
+            last = i == len(parts) - 1
+            if rules and self._is_ignored(rules, rel + name, is_dir or not last):
+                return None
+            if last and not is_dir:
+                break
+            excluded = excluded or name.lower() in self.excluded_folder_names_for_content
+            if excluded and self.prune_excluded_folders:
+                return None
+            if not last:
+                rel += name + '/'
+                rules = self._folder_rules(rel)
+        return excluded, rules, rel
+
+    # -------------------------------------------------------------------------
+    # _folder_rules
+    # Purpose: Ignore rules in effect inside a folder (cached per folder).
+    # -------------------------------------------------------------------------
+    def _folder_rules(self, rel: str) -> tuple:
+        if not self.respect_ignore_files:
+            return ()
+        cache = self._watch_rules
+        if rel not in cache:
+            parent = rel[:-1].rpartition('/')[0]
+            inherited = self._folder_rules(parent + '/' if parent else '') if rel else ()
+            try:
+                with os.scandir(self.start_path / rel) as it:
+                    entries = [e for e in it if e.name in IGNORE_FILE_NAMES]
+            except OSError:
+                entries = []
+            cache[rel] = self._load_ignore_rules(entries, rel, inherited)
+        return cache[rel]
+
+
+# -----------------------------------------------------------------------------
+# Built-in extractors
+# Purpose: Registry adapters for the PDF/DOCX readers (their libraries are
+#          imported on first use inside the readers). Untruncated; the
+#          scanner applies max_chars_per_file.
+# -----------------------------------------------------------------------------
+def extract_pdf(scanner: FileScanner, source: Union[Path, BinaryIO]) -> str:
+    return scanner._pdf_text(source)
+
+
+def extract_docx(scanner: FileScanner, source: Union[Path, BinaryIO]) -> str:
+    return scanner._docx_text(source)
+
+
+default_registry = ExtractorRegistry()
+default_registry.register(['.pdf'], extract_pdf, cost=EXPENSIVE, name='pdf', magic=[b'%PDF-'])
+default_registry.register(['.docx'], extract_docx, cost=EXPENSIVE, name='docx')
+
+
+# -----------------------------------------------------------------------------
+# CSV helpers
+# -----------------------------------------------------------------------------
+CSV_COLUMNS = ['relative_path', 'file_name', 'file_extension', 'content']
+
+
+# -----------------------------------------------------------------------------
+# _csv_safe
+# Purpose: Make content safe for CSV (escape quotes, visualize newlines/tabs).
+# -----------------------------------------------------------------------------
+def _csv_safe(content: str) -> str:
+    if content is None:
+        content = ""
+    # Escape double quotes
+    content = content.replace('"', '""')
+    # Normalize newlines and tabs
+    content = content.replace('\r\n', '\\n').replace('\n', '\\n').replace('\r', '\\n')
+    content = content.replace('\t', '\\t')
+    return content
+
+
+# -----------------------------------------------------------------------------
+# Class: _EscapingDictWriter
+# Purpose: DictWriter that applies _csv_safe to the content column, so rows
+#          keep the raw text for the other outputs (SQLite, manifest).
+# -----------------------------------------------------------------------------
+class _EscapingDictWriter(csv.DictWriter):
+    def writerow(self, rowdict):
+        if rowdict.get('content'):
+            rowdict = dict(rowdict, content=_csv_safe(rowdict['content']))
+        return super().writerow(rowdict)
+
+    def writerows(self, rowdicts):
+        for rowdict in rowdicts:
+            self.writerow(rowdict)
+
+
+# `escape_content=False` copies rows read back from one of our CSVs as they are
+def _csv_dict_writer(csv_file, columns: Sequence[str] = CSV_COLUMNS, escape_content: bool = True) -> csv.DictWriter:
+    return (_EscapingDictWriter if escape_content else csv.DictWriter)(
+        csv_file,
+        fieldnames=columns,
+        delimiter=',',
+        quotechar='"',
+        quoting=csv.QUOTE_ALL,
+        extrasaction='ignore'
+    )
+
+
+# -----------------------------------------------------------------------------
+# Compressed CSV output
+# Purpose: Pick the compression from the output name (.csv.gz / .csv.xz /
+#          .zip) and compress rows as they are written, so no uncompressed
+#          copy ever hits the disk.
+# -----------------------------------------------------------------------------
+COMPRESSION_SUFFIXES = {'.gz': 'gz', '.xz': 'xz', '.zip': 'zip'}
+OUTPUT_BUFFER_SIZE = 1024 * 1024  # large writes; fewer syscalls and compressor calls
+
+
+def output_compression(output_file: str) -> Optional[str]:
+    return COMPRESSION_SUFFIXES.get(Path(output_file).suffix.lower())
+
+
+# -----------------------------------------------------------------------------
+# with_compression
+# Purpose: Output name for a --compress choice, e.g. scan.csv + gz =>
+#          scan.csv.gz and scan.csv + zip => scan.zip.
+# -----------------------------------------------------------------------------
+def with_compression(output_file: str, compression: Optional[str]) -> str:
+    if not compression or output_compression(output_file) == compression:
+        return output_file
+    path = Path(output_file)
+    if compression == 'zip':
+        return str(path.with_suffix('.zip'))
+    return f"{output_file}.{compression}"
+
+
+# -----------------------------------------------------------------------------
+# open_csv_output
+# Purpose: Open a CSV output file for text writing (UTF-8 with BOM, csv
+#          newline handling), compressed on the fly when the name asks for it.
+# Logic: Raw file => GzipFile / LZMAFile / zip member => 1 MB buffer => text.
+#        A .zip holds a single member named like the archive with .csv.
+#        Closing the returned stream closes every layer.
+# Returns: A text stream; use it as a context manager.
+# -----------------------------------------------------------------------------
+def open_csv_output(output_file: str, compression: Optional[str] = None) -> io.TextIOBase:
+    compression = compression or output_compression(output_file)
+    if compression is None:
+        return open(output_file, 'w', newline='', encoding='utf-8-sig', buffering=OUTPUT_BUFFER_SIZE)
+
+    with ExitStack() as stack:
+        if compression == 'gz':
+            import gzip
+            raw = stack.enter_context(open(output_file, 'wb', buffering=OUTPUT_BUFFER_SIZE))
+            # Level 6: most of the ratio of 9 at a fraction of the CPU time
+            binary = stack.enter_context(gzip.GzipFile(
+                filename=Path(output_file).name[:-3], mode='wb', fileobj=raw, compresslevel=6))
+        elif compression == 'xz':
+            import lzma
+            raw = stack.enter_context(open(output_file, 'wb', buffering=OUTPUT_BUFFER_SIZE))
+            binary = stack.enter_context(lzma.LZMAFile(raw, 'wb'))
+        elif compression == 'zip':
+            import zipfile
+            archive = stack.enter_context(
+                zipfile.ZipFile(output_file, 'w', zipfile.ZIP_DEFLATED, compresslevel=6))
+            member = Path(output_file).stem
+            if not member.lower().endswith('.csv'):
+                member += '.csv'
+            binary = stack.enter_context(archive.open(member, 'w', force_zip64=True))
+        else:
+            raise ValueError(f"Unknown compression: {compression}")
+        # Feed the compressor large blocks instead of every small text flush
+        binary = io.BufferedWriter(binary, OUTPUT_BUFFER_SIZE)
+        return _CompressedTextOutput(binary, stack.pop_all())
+
+
+class _CompressedTextOutput(io.TextIOWrapper):
+    """
+    UTF-8 text stream over a compressor that also closes the layers below it.
+    """
+
+    def __init__(self, binary: BinaryIO, layers: ExitStack):
+        super().__init__(binary, encoding='utf-8-sig', newline='')
+        self._layers = layers
+
+    def close(self):
+        if self.closed:
+            return
+        try:
+            super().close()
+        finally:
+            self._layers.close()
+
+
+# -----------------------------------------------------------------------------
+# estimate_tokens
+# Purpose: Cheap LLM token estimate (~4 characters per token).
+# -----------------------------------------------------------------------------
+def estimate_tokens(text: str) -> int:
+    return (len(text) + 3) // 4
+
+
+# -----------------------------------------------------------------------------
+# Class: ShardedCSVWriter
+# Purpose: Streaming writer that rolls over to a new CSV shard whenever the
+#          next row would exceed the byte or token budget of the current one.
+# Logic: - Rows of one folder arrive together (walk order), so they share a
+#          shard unless it runs full. When a new folder starts and the shard
+#          is already FOLDER_BREAK_FILL full, the folder starts a new shard.
+#        - A row larger than a whole shard is split across shards; its
+#          content carries continuation markers and the index lists it once
+#          per part.
+#        - Budgets apply to the uncompressed CSV text, also for compressed
+#          shards (.csv.gz, ...).
+# -----------------------------------------------------------------------------
+class ShardedCSVWriter:
+    """
+    Writes rows into size/token-bounded CSV shards plus a path => shard index.
+    """
+
+    FOLDER_BREAK_FILL = 0.9
+    CONTINUED_FROM = '[...continued from previous shard...] '
+    CONTINUED_IN = ' [...continued in next shard...]'
+
+    def __init__(
+        self,
+        output_file: str,
+        max_shard_bytes: Optional[int] = None,
+        max_shard_tokens: Optional[int] = None,
+        columns: Sequence[str] = CSV_COLUMNS
+    ):
+        if not max_shard_bytes and not max_shard_tokens:
+            raise ValueError("Sharded output needs max_shard_bytes and/or max_shard_tokens")
+        self.max_bytes = max_shard_bytes
+        self.max_tokens = max_shard_tokens
+        self.columns = list(columns)
+
+        # scan.csv.gz => scan.part001.csv.gz, ...; the index stays plain CSV
+        self.compression = output_compression(output_file)
+        out = Path(output_file)
+        name = out.name
+        if self.compression:
+            name = name[: -len(out.suffix)]
+        if Path(name).suffix:
+            name = name[: -len(Path(name).suffix)]
+        self.stem = out.parent / name
+        self.shard_suffix = {None: '.csv', 'zip': '.zip'}.get(self.compression, '.csv' + out.suffix.lower())
+        self.index_path = str(self.stem) + '.index.csv'
+
+        self.shard_count = 0
+        self._shard_file = None
+        self._shard_writer = None
+        self._rows_in_shard = 0
+        self._used_bytes = 0
+        self._used_tokens = 0
+        self._last_folder = None
+        self._probe = io.StringIO()
+        self._probe_writer = _csv_dict_writer(self._probe, self.columns)
+
+        self._index_file = open(self.index_path, 'w', newline='', encoding='utf-8-sig')
+        self._index_writer = _csv_dict_writer(self._index_file, ['relative_path', 'shard', 'part'])
+        self._index_writer.writeheader()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    @property
+    def shard_path(self) -> str:
+        return f"{self.stem}.part{self.shard_count:03d}{self.shard_suffix}"
+
+    # -------------------------------------------------------------------------
+    # _cost
+    # Purpose: Serialized size of one row as (utf-8 bytes, estimated tokens).
+    # -------------------------------------------------------------------------
+    def _cost(self, info: Dict) -> Tuple[int, int]:
+        self._probe.seek(0)
+        self._probe.truncate()
+        self._probe_writer.writerow(info)
+        text = self._probe.getvalue()
+        return len(text.encode('utf-8')), estimate_tokens(text)
+
+    def _fits(self, cost: Tuple[int, int]) -> bool:
+        return ((self.max_bytes is None or self._used_bytes + cost[0] <= self.max_bytes) and
+                (self.max_tokens is None or self._used_tokens + cost[1] <= self.max_tokens))
+
+    def _fill_ratio(self) -> float:
+        ratios = []
+        if self.max_bytes:
+            ratios.append(self._used_bytes / self.max_bytes)
+        if self.max_tokens:
+            ratios.append(self._used_tokens / self.max_tokens)
+        return max(ratios)
+
+    # -------------------------------------------------------------------------
+    # _new_shard
+    # Purpose: Close the current shard and start the next one with a header.
+    # -------------------------------------------------------------------------
+    def _new_shard(self):
+        if self._shard_file is not None:
+            self._shard_file.close()
+        self.shard_count += 1
+        self._shard_file = open_csv_output(self.shard_path)
+        self._shard_writer = _csv_dict_writer(self._shard_file, self.columns)
+        self._shard_writer.writeheader()
+        header = ','.join(f'"{c}"' for c in self.columns) + '\r\n'
+        self._rows_in_shard = 0
+        self._used_bytes = len(codecs.BOM_UTF8) + len(header)
+        self._used_tokens = estimate_tokens(header)
+
+    def _emit(self, info: Dict, cost: Tuple[int, int], part: int):
+        self._shard_writer.writerow(info)
+        self._rows_in_shard += 1
+        self._used_bytes += cost[0]
+        self._used_tokens += cost[1]
+        self._index_writer.writerow({'relative_path': info['relative_path'], 'shard': Path(self.shard_path).name, 'part': part})
+
+    # -------------------------------------------------------------------------
+    # write
+    # Purpose: Place one row, rolling over / splitting as needed.
+    # -------------------------------------------------------------------------
+    def write(self, info: Dict):
+        folder = str(Path(info['relative_path']).parent)
+        starts_folder = folder != self._last_folder
+        self._last_folder = folder
+
+        if self._shard_file is None:
+            self._new_shard()
+        elif starts_folder and self._fill_ratio() >= self.FOLDER_BREAK_FILL:
+            self._new_shard()
+
+        cost = self._cost(info)
+        if self._fits(cost):
+            self._emit(info, cost, 1)
+            return
+
+        # Does it fit into an empty shard? Then just roll over.
+        if self._rows_in_shard:
+            self._new_shard()
+            if self._fits(cost):
+                self._emit(info, cost, 1)
+                return
+        self._write_split(info)
+
+    # -------------------------------------------------------------------------
+    # _write_split
+    # Purpose: Spread an oversized row over as many fresh shards as needed,
+    #          choosing each chunk by binary search on its serialized cost.
+    # -------------------------------------------------------------------------
+    def _write_split(self, info: Dict):
+        content = info.get('content') or ''
+        # If not even one character plus both markers fits an empty shard, the
+        # metadata alone is over budget: write the row whole instead of
+        # opening shard after shard for ever.
+        smallest = dict(info, content=self.CONTINUED_FROM + content[:1] + self.CONTINUED_IN)
+        if not self._fits(self._cost(smallest)):
+            logger.warning("Row exceeds the shard budget on its own, written unsplit: %s", info['relative_path'])
+            self._emit(info, self._cost(info), 1)
+            return
+
+        start = 0
+        part = 1
+        while start < len(content):
+            prefix = self.CONTINUED_FROM if part > 1 else ''
+            rest = dict(info, content=prefix + content[start:])
+            rest_cost = self._cost(rest)
+            if self._fits(rest_cost):
+                self._emit(rest, rest_cost, part)
+                return
+
+            lo, hi = 1, len(content) - start
+            while lo < hi:
+                mid = (lo + hi + 1) // 2
+                candidate = dict(info, content=prefix + content[start:start + mid] + self.CONTINUED_IN)
+                if self._fits(self._cost(candidate)):
+                    lo = mid
+                else:
+                    hi = mid - 1
+            # Keep \r\n together: _csv_safe turns it into a single \\n
+            if lo > 1 and content[start + lo - 1] == '\r' and content[start + lo:start + lo + 1] == '\n':
+                lo -= 1
+            chunk = dict(info, content=prefix + content[start:start + lo] + self.CONTINUED_IN)
+            self._emit(chunk, self._cost(chunk), part)
+            start += lo
+            part += 1
+            if start < len(content):
+                self._new_shard()
+
+    def close(self):
+        if self._shard_file is not None:
+            self._shard_file.close()
+            self._shard_file = None
+        if self._index_file is not None:
+            self._index_file.close()
+            self._index_file = None
+
+
+# -----------------------------------------------------------------------------
+# SQLite output helpers
+# -----------------------------------------------------------------------------
+SQLITE_SUFFIXES = {'.sqlite', '.sqlite3', '.db'}
+
+_SQLITE_INSERT = (" INTO files (relative_path, file_name, file_extension, content, size, mtime, content_hash)"
+                  " VALUES (?, ?, ?, ?, ?, ?, ?)")
+
+
+def _sqlite_values(r: Dict) -> tuple:
+    return (r['relative_path'], r['file_name'], r['file_extension'], r['content'],
+            r.get('size'), r.get('mtime'), r.get('content_hash'))
+
+# External-content FTS5 index over files.content; the triggers keep it in
+# sync for later single-row updates.
+_FTS_SCHEMA = """
+CREATE VIRTUAL TABLE IF NOT EXISTS files_fts USING fts5(content, content='files', content_rowid='id');
+CREATE TRIGGER IF NOT EXISTS files_ai AFTER INSERT ON files BEGIN
+    INSERT INTO files_fts (rowid, content) VALUES (new.id, new.content);
+END;
+CREATE TRIGGER IF NOT EXISTS files_ad AFTER DELETE ON files BEGIN
+    INSERT INTO files_fts (files_fts, rowid, content) VALUES ('delete', old.id, old.content);
+END;
+CREATE TRIGGER IF NOT EXISTS files_au AFTER UPDATE ON files BEGIN
+    INSERT INTO files_fts (files_fts, rowid, content) VALUES ('delete', old.id, old.content);
+    INSERT INTO files_fts (rowid, content) VALUES (new.id, new.content);
+END;
+"""
+
+
+# -----------------------------------------------------------------------------
+# query_sqlite
+# Purpose: Full-text search in a database written by write_sqlite.
+# Returns: (relative_path, snippet) pairs, best matches first. `query` uses
+#          FTS5 syntax, e.g. 'invoice AND total' or '"exact phrase"'.
+# -----------------------------------------------------------------------------
+def query_sqlite(db_file: str, query: str, limit: int = 20) -> List[Tuple[str, str]]:
+    conn = sqlite3.connect(f"file:{Path(db_file).as_posix()}?mode=ro", uri=True)
+    try:
+        return conn.execute(
+            "SELECT f.relative_path, snippet(files_fts, 0, '[', ']', '…', 16)"
+            " FROM files_fts JOIN files f ON f.id = files_fts.rowid"
+            " WHERE files_fts MATCH ? ORDER BY rank LIMIT ?",
+            (query, limit)
+        ).fetchall()
+    finally:
+        conn.close()
+
+
+# -----------------------------------------------------------------------------
+# update_sqlite
+# Purpose: Apply watch-mode changes to a database from write_sqlite in one
+#          transaction. The FTS triggers keep the full-text index in sync,
+#          so the cost depends on the number of changed rows only.
+# -----------------------------------------------------------------------------
+def update_sqlite(db_file: str, updates: Dict[str, List[Dict]], removed: Iterable[str]):
+    conn = sqlite3.connect(db_file)
+    try:
+        with conn:
+            for prefix in removed:
+                conn.execute("DELETE FROM files WHERE substr(relative_path, 1, ?) = ?", (len(prefix), prefix))
+            for path, rows in updates.items():
+                member_prefix = path + '!/'
+                conn.execute(
+                    "DELETE FROM files WHERE relative_path = ? OR substr(relative_path, 1, ?) = ?",
+                    (path, len(member_prefix), member_prefix)
                 )
-                writer.writeheader()
-                for info in file_list:
-                    writer.writerow(info)
+                conn.executemany("INSERT OR REPLACE" + _SQLITE_INSERT, [_sqlite_values(r) for r in rows])
+    finally:
+        conn.close()
+
+
+# -----------------------------------------------------------------------------
+# update_csv
+# Purpose: Apply watch-mode changes to a CSV written in walk order.
+# Logic: Stream the old rows into a temp file, dropping replaced/removed
+#        ones and inserting new rows at their walk position (walk_key of
+#        the file the row belongs to; archive members follow their archive),
+#        then fsync and atomically replace the CSV. Readers never see a
+#        half-written file; no source file is read again.
+# -----------------------------------------------------------------------------
+def update_csv(output_file: str, columns: Sequence[str], updates: Dict[str, List[Dict]], removed: Iterable[str]):
+    def key(path: str) -> tuple:
+        return walk_key(Path(path).parts[1:])
+
+    removed = tuple(removed)
+    pending = sorted(((key(path), rows) for path, rows in updates.items() if rows),
+                     key=lambda item: item[0], reverse=True)
+    tmp = output_file + '.tmp'
+    with open(output_file, 'r', newline='', encoding='utf-8-sig') as src, \
+            open(tmp, 'w', newline='', encoding='utf-8-sig', buffering=OUTPUT_BUFFER_SIZE) as dst:
+        writer = _csv_dict_writer(dst, columns)
+        copier = _csv_dict_writer(dst, columns, escape_content=False)  # old rows are escaped already
+        writer.writeheader()
+        for row in csv.DictReader(src):
+            path = row['relative_path'].split('!/', 1)[0]
+            if path in updates or path.startswith(removed):
+                continue
+            row_key = key(path)
+            while pending and pending[-1][0] < row_key:
+                writer.writerows(pending.pop()[1])
+            copier.writerow(row)
+        while pending:
+            writer.writerows(pending.pop()[1])
+        dst.flush()
+        os.fsync(dst.fileno())
+    os.replace(tmp, output_file)
+
+
+# -----------------------------------------------------------------------------
+# Watch mode: change sources
+# Purpose: Report touched paths below a root. read(timeout) returns
+#          (set of paths, overflow flag); a path may be a file or folder
+#          that was created, changed, moved or deleted. `should_watch(dir)`
+#          keeps pruned/ignored folders out.
+# -----------------------------------------------------------------------------
+def open_watcher(root: Path, should_watch: Callable[[Path], bool], poll_interval: float = 2.0):
+    try:
+        return InotifyWatcher(root, should_watch)
+    except OSError as e:
+        logger.info("inotify not available (%s); polling every %.1f s", e, poll_interval)
+        return PollingWatcher(root, should_watch, poll_interval)
+
+
+# -----------------------------------------------------------------------------
+# Class: InotifyWatcher
+# Purpose: Linux inotify through ctypes (no extra dependency), one watch
+#          per folder; new folders are watched as they appear.
+# -----------------------------------------------------------------------------
+class InotifyWatcher:
+    """
+    Folder watcher on top of Linux inotify.
+    """
+
+    kind = "inotify"
+
+    IN_MODIFY, IN_CLOSE_WRITE, IN_MOVED_FROM, IN_MOVED_TO = 0x2, 0x8, 0x40, 0x80
+    IN_CREATE, IN_DELETE, IN_Q_OVERFLOW, IN_IGNORED = 0x100, 0x200, 0x4000, 0x8000
+    IN_ONLYDIR, IN_DONT_FOLLOW, IN_ISDIR = 0x1000000, 0x2000000, 0x40000000
+    MASK = (IN_MODIFY | IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO | IN_CREATE | IN_DELETE |
+            IN_ONLYDIR | IN_DONT_FOLLOW)
+
+    def __init__(self, root: Path, should_watch: Callable[[Path], bool]):
+        import ctypes
+        import ctypes.util
+        import select
+        import struct
+
+        if not sys.platform.startswith('linux'):
+            raise OSError("inotify needs Linux")
+        self._libc = ctypes.CDLL(ctypes.util.find_library('c') or 'libc.so.6', use_errno=True)
+        self._ctypes = ctypes
+        self._select = select
+        self._header = struct.Struct('iIII')
+        self.fd = self._libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+        if self.fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+        self.should_watch = should_watch
+        self._dirs = {}  # watch descriptor => folder
+        try:
+            self._add_tree(root)
+        except OSError:
+            self.close()
+            raise
+
+    def _add_tree(self, folder: Path):
+        stack = [folder]
+        while stack:
+            folder = stack.pop()
+            wd = self._libc.inotify_add_watch(self.fd, os.fsencode(folder), self.MASK)
+            if wd < 0:
+                errno = self._ctypes.get_errno()
+                if errno in (2, 20):  # ENOENT/ENOTDIR: gone again already
+                    continue
+                raise OSError(errno, f"inotify_add_watch failed for {folder} "
+                                     "(raise fs.inotify.max_user_watches?)")
+            self._dirs[wd] = folder
+            try:
+                with os.scandir(folder) as it:
+                    for entry in it:
+                        if entry.is_dir(follow_symlinks=False) and self.should_watch(Path(entry.path)):
+                            stack.append(Path(entry.path))
+            except OSError:
+                continue
+
+    def _drop_tree(self, folder: Path):
+        for wd, path in list(self._dirs.items()):
+            if path == folder or folder in path.parents:
+                self._libc.inotify_rm_watch(self.fd, wd)
+                del self._dirs[wd]
+
+    def read(self, timeout: float) -> Tuple[set, bool]:
+        touched = set()
+        overflow = False
+        ready, _, _ = self._select.select([self.fd], [], [], timeout)
+        if not ready:
+            return touched, overflow
+        try:
+            data = os.read(self.fd, 256 * 1024)
+        except BlockingIOError:
+            return touched, overflow
+        offset = 0
+        while offset < len(data):
+            wd, mask, _cookie, length = self._header.unpack_from(data, offset)
+            name = data[offset + 16:offset + 16 + length].rstrip(b'\0')
+            offset += 16 + length
+            if mask & self.IN_Q_OVERFLOW:
+                overflow = True
+                continue
+            if mask & self.IN_IGNORED:
+                self._dirs.pop(wd, None)
+                continue
+            folder = self._dirs.get(wd)
+            if folder is None or not name:
+                continue
+            path = folder / os.fsdecode(name)
+            if mask & self.IN_ISDIR:
+                if mask & (self.IN_MOVED_FROM | self.IN_DELETE):
+                    self._drop_tree(path)
+                elif mask & (self.IN_CREATE | self.IN_MOVED_TO):
+                    if self.should_watch(path):
+                        self._add_tree(path)
+                else:
+                    continue  # folder attributes; its files report themselves
+            touched.add(path)
+        return touched, overflow
+
+    def close(self):
+        if self.fd >= 0:
+            os.close(self.fd)
+            self.fd = -1
+
+
+# -----------------------------------------------------------------------------
+# Class: PollingWatcher
+# Purpose: Portable fallback. Every poll stats the known folders only and
+#          rescans those whose mtime changed (files created, deleted or
+#          renamed). In-place edits do not touch the folder mtime, so every
+#          `sweep_every`-th poll also compares the stats of all known files.
+# -----------------------------------------------------------------------------
+class PollingWatcher:
+    """
+    Folder watcher that polls directory mtimes.
+    """
+
+    kind = "polling"
+
+    def __init__(self, root: Path, should_watch: Callable[[Path], bool],
+                 poll_interval: float = 2.0, sweep_every: int = 5):
+        self.should_watch = should_watch
+        self.poll_interval = poll_interval
+        self.sweep_every = sweep_every
+        self._polls = 0
+        self._next_poll = time.monotonic() + poll_interval
+        self._folders = {}  # folder => (mtime_ns, {name: (is_dir, size, mtime_ns)})
+        self._snapshot(root)
+
+    def _listing(self, folder: Path) -> Optional[Tuple[int, Dict]]:
+        try:
+            mtime_ns = os.stat(folder).st_mtime_ns
+            listing = {}
+            with os.scandir(folder) as it:
+                for entry in it:
+                    if entry.is_dir(follow_symlinks=False):
+                        listing[entry.name] = (True, 0, 0)
+                    elif entry.is_file():
+                        st = entry.stat()
+                        listing[entry.name] = (False, st.st_size, st.st_mtime_ns)
+            return mtime_ns, listing
+        except OSError:
+            return None
+
+    def _snapshot(self, folder: Path):
+        stack = [folder]
+        while stack:
+            folder = stack.pop()
+            state = self._listing(folder)
+            if state is None:
+                continue
+            self._folders[folder] = state
+            stack.extend(folder / name for name, (is_dir, _, _) in state[1].items()
+                         if is_dir and self.should_watch(folder / name))
+
+    def _forget(self, folder: Path):
+        for path in [p for p in self._folders if p == folder or folder in p.parents]:
+            del self._folders[path]
+
+    def read(self, timeout: float) -> Tuple[set, bool]:
+        wait = self._next_poll - time.monotonic()
+        if wait > timeout:
+            time.sleep(timeout)
+            return set(), False
+        time.sleep(max(0.0, wait))
+        self._next_poll = time.monotonic() + self.poll_interval
+        self._polls += 1
+        sweep = self._polls % self.sweep_every == 0
+
+        touched = set()
+        for folder, (mtime_ns, old) in list(self._folders.items()):
+            if folder not in self._folders:
+                continue  # forgotten while iterating
+            try:
+                changed = os.stat(folder).st_mtime_ns != mtime_ns
+            except OSError:
+                changed = True
+            if not changed and not sweep:
+                continue
+            state = self._listing(folder)
+            if state is None:
+                self._forget(folder)
+                touched.add(folder)
+                continue
+            self._folders[folder] = state
+            new = state[1]
+            for name in old.keys() | new.keys():
+                before, after = old.get(name), new.get(name)
+                if before == after:
+                    continue
+                path = folder / name
+                if before is not None and before[0]:
+                    self._forget(path)  # folder gone (or replaced by a file)
+                if after is not None and after[0] and self.should_watch(path):
+                    self._snapshot(path)  # new folder
+                touched.add(path)
+        return touched, False
+
+    def close(self):
+        self._folders = {}
+
+
+# -----------------------------------------------------------------------------
+# Process-pool helpers
+# Purpose: Each worker process receives one pickled FileScanner copy at start
+#          and runs collect_file_info on it for the files it is handed.
+# -----------------------------------------------------------------------------
+_worker_scanner: Optional[FileScanner] = None
+
+
+def _init_worker(scanner: FileScanner):
+    global _worker_scanner
+    scanner.extraction_timeout = None  # enforced by the parent, which can kill us
+    _worker_scanner = scanner
+
+
+def _extract_in_worker(extractor: Extractor, source: Union[Path, BinaryIO]) -> str:
+    return extractor.extract(_worker_scanner, source)
+
+
+# -----------------------------------------------------------------------------
+# _kill_pool
+# Purpose: Stop a process pool whose worker is stuck in an extraction that
+#          cannot be interrupted: kill its processes, then drop the pool.
+# -----------------------------------------------------------------------------
+def _kill_pool(pool):
+    for process in list((pool._processes or {}).values()):
+        process.kill()
+    pool.shutdown(wait=False, cancel_futures=True)
+
+
+def _collect_in_worker(file_path: Path, excluded: bool) -> Tuple[Optional[Dict], Optional[ScanStats]]:
+    # Stats are per call so the parent can merge exactly this file's share
+    if _worker_scanner.stats is not None:
+        _worker_scanner.stats = ScanStats(_worker_scanner.stats.slowest_n)
+    return _worker_scanner.collect_file_info(file_path, excluded), _worker_scanner.stats
+
+
+# -----------------------------------------------------------------------------
+# Command line
+# Purpose: Headless entry point (console script `dir2csv`). Imports neither
+#          tkinter nor the PDF/DOCX libraries unless a scan needs them.
+# Exit codes: 0 ok, 1 error, 2 invalid arguments, 3 finished but some files
+#             could not be processed, 130 interrupted.
+# -----------------------------------------------------------------------------
+EXIT_OK, EXIT_ERROR, EXIT_USAGE, EXIT_PARTIAL, EXIT_INTERRUPTED = 0, 1, 2, 3, 130
+
+
+def _extension_set(value: str) -> set:
+    exts = set()
+    for item in value.split(','):
+        item = item.strip().lower()
+        if item:
+            exts.add(item if item.startswith('.') else '.' + item)
+    return exts
+
+
+def _name_set(value: str) -> set:
+    return {item.strip().lower() for item in value.split(',') if item.strip()}
+
+
+def build_arg_parser():
+    import argparse
+
+    parser = argparse.ArgumentParser(
+        prog="dir2csv",
+        description="Recursively scan folders and export paths and file contents to CSV or SQLite."
+    )
+    parser.add_argument("-i", "--input", action="append", metavar="FOLDER",
+                        help="Folder to scan (repeat for several roots; default: current folder)")
+    parser.add_argument("-o", "--output", default=CSV_AUSGABE_DATEI,
+                        help=f"Output file; .sqlite/.db writes a database (default: {CSV_AUSGABE_DATEI})")
+
+    filters = parser.add_argument_group("file selection")
+    filters.add_argument("--include-ext", type=_extension_set, metavar="EXTS",
+                         help="Only list these extensions, e.g. '.py,.md' (disables probing unknown files)")
+    filters.add_argument("--exclude-ext", type=_extension_set, metavar="EXTS",
+                         help="Never list these extensions")
+    filters.add_argument("--binary-ext", type=_extension_set, metavar="EXTS",
+                         help="Additional extensions written with the binary placeholder")
+    filters.add_argument("--exclude-folders", type=_name_set, metavar="NAMES",
+                         help="Replace the excluded folder names, e.g. '.git,node_modules,logs'")
+    filters.add_argument("--prune", action="store_true",
+                         help="Do not descend into excluded folders (default: list files, skip content)")
+    filters.add_argument("--respect-ignore", action="store_true",
+                         help="Skip paths ignored by .gitignore, .dir2csvignore and the root .dockerignore")
+    filters.add_argument("--archives", action="store_true",
+                         help="Also list the members of .zip/.jar/.tar(.gz)/.gz files (in memory)")
+    filters.add_argument("--archive-member-max", type=int, metavar="N", default=32 * 1024 * 1024,
+                         help="Do not read archive members larger than N bytes (default: 32 MiB)")
+    filters.add_argument("--archive-depth", type=int, metavar="N", default=2,
+                         help="Open archives nested up to N levels deep (default: 2)")
+    filters.add_argument("--no-probe", action="store_true",
+                         help="Do not sniff files with unknown extensions")
+
+    perf = parser.add_argument_group("performance and limits")
+    perf.add_argument("-w", "--workers", type=int, default=1, help="Parallel extraction workers (default: 1)")
+    perf.add_argument("--max-bytes", type=int, metavar="N", help="Read at most N bytes per text file")
+    perf.add_argument("--max-chars", type=int, metavar="N", help="Keep at most N characters per file")
+    perf.add_argument("--sample-over", type=int, metavar="N",
+                      help="Sample text files larger than N bytes (head/tail) instead of reading them fully")
+    perf.add_argument("--sample-kb", type=int, default=64, metavar="KB",
+                      help="Sampling: KB taken from the start and the end (default: 64)")
+    perf.add_argument("--sample-chunks", type=int, default=0, metavar="N",
+                      help="Sampling: additional evenly spaced middle chunks (default: 0)")
+    perf.add_argument("--timeout", type=float, metavar="SEC", help="Time limit per PDF/DOCX extraction")
+    perf.add_argument("--incremental", action="store_true",
+                      help="Reuse rows of unchanged files via <output>.manifest.sqlite")
+    perf.add_argument("--resume", action="store_true",
+                      help="Continue an interrupted scan from <output>.checkpoint.json")
+    perf.add_argument("--checkpoint-interval", type=float, metavar="SEC", default=60.0,
+                      help="Seconds between resume checkpoints for plain CSV output (0: off; default: 60)")
+    perf.add_argument("--dedup", action="store_true", help="Extract identical files once; adds content_hash")
+
+    out = parser.add_argument_group("output")
+    out.add_argument("--compress", choices=sorted(set(COMPRESSION_SUFFIXES.values())),
+                     help="Compress the CSV on the fly (also implied by -o *.csv.gz / *.csv.xz / *.zip)")
+    out.add_argument("--shard-bytes", type=int, metavar="N", help="Split the CSV into shards of at most N bytes")
+    out.add_argument("--shard-tokens", type=int, metavar="N", help="Split the CSV into shards of ~N LLM tokens")
+    out.add_argument("--watch", action="store_true",
+                     help="Keep running and update the output as files change (plain CSV or SQLite)")
+    out.add_argument("--poll-interval", type=float, metavar="SEC", default=2.0,
+                     help="Watch: polling interval where inotify is unavailable (default: 2)")
+    out.add_argument("--query", metavar="FTS",
+                     help="Search an existing SQLite output (FTS5 syntax) instead of scanning")
+    out.add_argument("--limit", type=int, default=20, help="Maximum results for --query (default: 20)")
+
+    diag = parser.add_argument_group("diagnostics")
+    diag.add_argument("--stats", nargs="?", const="-", metavar="JSON_FILE",
+                      help="Log a timing summary; with a file name also write it as JSON")
+    diag.add_argument("--profile", metavar="PSTATS_FILE", help="Run under cProfile and save the profile")
+    diag.add_argument("-v", "--verbose", action="count", default=0, help="More log output (-vv: every file)")
+    diag.add_argument("-q", "--quiet", action="store_true", help="Only log warnings and errors")
+    return parser
+
+
+def _scanner_from_args(args) -> FileScanner:
+    scanner = FileScanner(
+        prune_excluded_folders=args.prune,
+        workers=args.workers,
+        max_bytes_per_file=args.max_bytes,
+        max_chars_per_file=args.max_chars,
+        extraction_timeout=args.timeout,
+        dedup=args.dedup,
+        collect_stats=args.stats is not None,
+        respect_ignore_files=args.respect_ignore,
+        scan_archives=args.archives,
+        max_archive_member_bytes=args.archive_member_max,
+        max_archive_depth=args.archive_depth,
+        sample_threshold=args.sample_over,
+        sample_bytes=args.sample_kb * 1024,
+        sample_middle_chunks=args.sample_chunks
+    )
+    if args.include_ext:
+        scanner.target_extensions = set(args.include_ext)
+        scanner.probe_unknown_files = False
+    if args.exclude_ext:
+        scanner.excluded_extensions = set(args.exclude_ext)
+    if args.binary_ext:
+        scanner.binary_extensions |= args.binary_ext
+        scanner.target_extensions |= args.binary_ext
+    if args.exclude_folders is not None:
+        scanner.excluded_folder_names_for_content = set(args.exclude_folders)
+    if args.no_probe:
+        scanner.probe_unknown_files = False
+    return scanner
+
+
+def _checkpointable(args) -> bool:
+    plain_csv = Path(args.output).suffix.lower() not in SQLITE_SUFFIXES and not output_compression(args.output)
+    return plain_csv and not (args.shard_bytes or args.shard_tokens) and (args.resume or args.checkpoint_interval > 0)
+
+
+def _run_scan(args, roots: List[Path]) -> int:
+    scanner = _scanner_from_args(args)
+    manifest_path = default_manifest_path(args.output) if args.incremental else None
+
+    def rows():
+        for root in roots:
+            yield from scanner.iter_scan(str(root), manifest_path)
+
+    if args.watch:
+        scanner.watch(str(roots[0]), args.output, manifest_path, poll_interval=args.poll_interval)
+    elif args.shard_bytes or args.shard_tokens:
+        scanner.write_sharded(rows(), args.output, args.shard_bytes, args.shard_tokens)
+    elif _checkpointable(args):
+        scanner.write_checkpointed([str(r) for r in roots], args.output, manifest_path,
+                                   resume=args.resume, interval=args.checkpoint_interval)
+    else:
+        scanner.write_output(rows(), args.output)
+
+    if scanner.stats is not None:
+        logger.info(scanner.stats.report())
+        if args.stats != "-":
+            Path(args.stats).write_text(scanner.stats.to_json(), encoding='utf-8')
+    if scanner.failed_files:
+        logger.warning("%d file(s) could not be processed", scanner.failed_files)
+        return EXIT_PARTIAL
+    return EXIT_OK
+
+
+def cli_main(argv: Optional[Sequence[str]] = None) -> int:
+    parser = build_arg_parser()
+    args = parser.parse_args(argv)
+
+    level = logging.WARNING if args.quiet else (logging.DEBUG if args.verbose > 1 else logging.INFO)
+    logging.basicConfig(level=level, format="%(message)s")
+
+    if args.workers < 1:
+        parser.error("--workers must be at least 1")
+
+    if args.query is not None:
+        if Path(args.output).suffix.lower() not in SQLITE_SUFFIXES or not Path(args.output).is_file():
+            parser.error("--query needs an existing .sqlite/.db output (-o)")
+        try:
+            for relative_path, snippet in query_sqlite(args.output, args.query, args.limit):
+                print(f"{relative_path}\t{snippet}")
+        except sqlite3.Error as e:
+            logger.error("Query failed: %s", e)
+            return EXIT_ERROR
+        return EXIT_OK
+
+    if args.compress:
+        if Path(args.output).suffix.lower() in SQLITE_SUFFIXES:
+            parser.error("--compress applies to CSV output only")
+        args.output = with_compression(args.output, args.compress)
+
+    if args.resume and not _checkpointable(args):
+        parser.error("--resume works with plain (uncompressed, unsharded) CSV output only")
+    if args.watch:
+        if args.input and len(args.input) > 1:
+            parser.error("--watch takes a single --input folder")
+        if args.dedup or args.resume or args.shard_bytes or args.shard_tokens or output_compression(args.output):
+            parser.error("--watch cannot be combined with --dedup, --resume, sharding or compression")
+
+    roots = [Path(p) for p in (args.input or [TO_Scan_Ordner or "."])]
+    for root in roots:
+        if not root.is_dir():
+            parser.error(f"not a folder: {root}")
+
+    try:
+        if args.profile:
+            import cProfile
+            profiler = cProfile.Profile()
+            try:
+                return profiler.runcall(_run_scan, args, roots)
+            finally:
+                profiler.dump_stats(args.profile)
+                logger.info("Profile written to %s", args.profile)
+        return _run_scan(args, roots)
+    except KeyboardInterrupt:
+        logger.error("Interrupted.")
+        return EXIT_INTERRUPTED
+    except Exception as e:
+        logger.error("Scan failed: %s", e)
+        return EXIT_ERROR
 
-            print(f"CSV successfully created: {output_file}")
-            print(f"Entry count: {len(file_list)}")
 
-        except Exception as e:
-            print(f"Error creating CSV: {e}")
 if __name__ == "__main__":
-    scanner =FileScanner()
-    found = scanner.scan_folder(TO_Scan_Ordner)
-    scanner.create_csv(found, CSV_AUSGABE_DATEI)
-    print( f"Scan finished.\nFile saved to:\n{CSV_AUSGABE_DATEI}")
-    
\ No newline at end of file
+    multiprocessing.freeze_support()
+    raise SystemExit(cli_main())
@@ -0,0 +1,189 @@
+# benchmarks/bench_scanner.py
+import argparse
+import json
+import platform
+import shutil
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from Dir2CSV import FileScanner  # noqa: E402
+from generate_tree import TreeSpec, generate_tree  # noqa: E402
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+
+# -----------------------------------------------------------------------------
+# peak_rss_mb
+# Purpose: Peak resident set size of this process so far (None if unknown).
+#          A process-lifetime high-water mark: reported once per run, not
+#          per phase (see traced_peak_mb).
+# -----------------------------------------------------------------------------
+def peak_rss_mb():
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports KiB, macOS bytes
+    return round(peak / (1024 * 1024) if sys.platform == 'darwin' else peak / 1024, 1)
+
+
+# -----------------------------------------------------------------------------
+# traced_peak_mb
+# Purpose: Peak Python heap allocated while `func` runs (tracemalloc), i.e.
+#          the memory of this phase alone. Runs untimed, since tracing slows
+#          allocation down; memory of worker processes is not included.
+# -----------------------------------------------------------------------------
+def traced_peak_mb(func):
+    tracemalloc.start()
+    try:
+        func()
+        return round(tracemalloc.get_traced_memory()[1] / (1024 * 1024), 1)
+    finally:
+        tracemalloc.stop()
+
+
+# -----------------------------------------------------------------------------
+# measure
+# Purpose: Time `func` over `items` and return throughput figures.
+#          `size_of` gives the bytes processed per item, `count_of` how many
+#          items (e.g. rows of a batch) one call handles.
+# -----------------------------------------------------------------------------
+def measure(name, func, items, size_of, repeat=1, count_of=lambda item: 1):
+    items = list(items)
+    total_bytes = sum(size_of(i) for i in items) * repeat
+    t0 = time.perf_counter()
+    for _ in range(repeat):
+        for item in items:
+            func(item)
+    seconds = time.perf_counter() - t0
+    count = sum(count_of(i) for i in items) * repeat
+    return {
+        'name': name,
+        'items': count,
+        'seconds': round(seconds, 4),
+        'items_per_second': round(count / seconds, 1) if seconds else None,
+        'mb_per_second': round(total_bytes / seconds / 1e6, 2) if seconds else None,
+        'peak_alloc_mb': traced_peak_mb(lambda: run_all(func, items)),
+    }
+
+
+# -----------------------------------------------------------------------------
+# run_all
+# Purpose: Call `func` on every item, dropping each result right away so a
+#          traced pass measures the phase, not the sum of its outputs.
+# -----------------------------------------------------------------------------
+def run_all(func, items):
+    for item in items:
+        func(item)
+
+
+def run(root: Path, output_dir: Path, workers: int, sample: int) -> dict:
+    results = []
+    scanner = FileScanner(workers=workers)
+
+    # Full scan (walk + extraction), then CSV writing on the materialized rows
+    t0 = time.perf_counter()
+    rows = scanner.scan_folder(str(root))
+    scan_seconds = time.perf_counter() - t0
+    scan_bytes = sum(r.get('size') or 0 for r in rows)
+    results.append({
+        'name': 'scan_folder',
+        'items': len(rows),
+        'seconds': round(scan_seconds, 4),
+        'items_per_second': round(len(rows) / scan_seconds, 1) if scan_seconds else None,
+        'mb_per_second': round(scan_bytes / scan_seconds / 1e6, 2) if scan_seconds else None,
+        'peak_alloc_mb': traced_peak_mb(lambda: scanner.scan_folder(str(root))),
+    })
+
+    content_bytes = lambda r: len(r['content'].encode('utf-8'))
+    csv_path = output_dir / 'bench.csv'
+    # One call writes all rows: count rows, not calls
+    results.append(measure('create_csv', lambda batch: scanner.create_csv(batch, str(csv_path)),
+                           [rows], lambda batch: sum(content_bytes(r) for r in batch), count_of=len))
+    for suffix in ('.csv.gz', '.csv.xz'):
+        packed_path = output_dir / ('bench' + suffix)
+        results.append(measure(f'create_csv[{suffix}]', lambda batch: scanner.create_csv(batch, str(packed_path)),
+                               [rows], lambda batch: sum(content_bytes(r) for r in batch), count_of=len))
+        results[-1]['output_bytes'] = packed_path.stat().st_size
+    del rows
+
+    # Individual readers on a sample of files per kind
+    by_ext = {}
+    for path in root.rglob('*'):
+        if path.is_file() and 'node_modules' not in path.parts and 'build' not in path.parts:
+            by_ext.setdefault(path.suffix.lower(), []).append(path)
+
+    text_files = [p for ext in ('.py', '.js', '.txt', '.json', '.md') for p in by_ext.get(ext, [])][:sample]
+    size = lambda p: p.stat().st_size
+    results.append(measure('read_file_content', scanner.read_file_content, text_files, size))
+    results.append(measure('read_pdf', scanner.read_pdf, by_ext.get('.pdf', [])[:sample], size))
+    results.append(measure('read_docx', scanner.read_docx, by_ext.get('.docx', [])[:sample], size))
+    logs = by_ext.get('.log', [])[:1]
+    results.append(measure('read_file_content[huge log]', scanner.read_file_content, logs, size))
+    sampler = FileScanner(sample_threshold=10 * 1024 * 1024, sample_middle_chunks=4)
+    results.append(measure('read_file_content[huge log, sampled]', sampler.read_file_content, logs, size))
+
+    heads = []
+    for p in (text_files + by_ext.get('.bin', []) + by_ext.get('.png', []))[:sample]:
+        with open(p, 'rb') as f:
+            heads.append(f.read(1024))
+    results.append(measure('is_probably_text', scanner.is_probably_text, heads, len, repeat=100))
+
+    return {
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'workers': workers,
+        'peak_rss_mb': peak_rss_mb(),
+        'results': results,
+    }
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmark Dir2CSV FileScanner on a synthetic tree.")
+    parser.add_argument("--tree", help="Existing tree to scan (default: generate a temporary one)")
+    parser.add_argument("--keep-tree", action="store_true", help="Do not delete the generated tree")
+    parser.add_argument("--workers", type=int, default=1)
+    parser.add_argument("--sample", type=int, default=200, help="Files per reader benchmark")
+    parser.add_argument("--output", help="Write JSON results to this file (default: stdout)")
+    for name, value in vars(TreeSpec()).items():
+        parser.add_argument(f"--{name.replace('_', '-')}", type=type(value), default=value)
+    args = parser.parse_args(argv)
+
+    work_dir = Path(tempfile.mkdtemp(prefix="dir2csv-bench-"))
+    try:
+        if args.tree:
+            root = Path(args.tree)
+            tree = None
+        else:
+            spec_fields = vars(TreeSpec()).keys()
+            spec = TreeSpec(**{k: getattr(args, k) for k in spec_fields})
+            root = work_dir / 'tree'
+            tree = generate_tree(root, spec)
+            tree['spec'] = vars(spec)
+
+        report = run(root, work_dir, args.workers, args.sample)
+        report['tree'] = tree or {'path': str(root)}
+        text = json.dumps(report, indent=2)
+        if args.output:
+            Path(args.output).write_text(text, encoding='utf-8')
+        else:
+            print(text)
+    finally:
+        if args.keep_tree and not args.tree:
+            print(f"Tree kept at: {work_dir / 'tree'}", file=sys.stderr)
+            for name in ('bench.csv', 'bench.csv.gz', 'bench.csv.xz'):
+                (work_dir / name).unlink(missing_ok=True)
+        else:
+            shutil.rmtree(work_dir, ignore_errors=True)
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,216 @@
+# benchmarks/generate_tree.py
+import argparse
+import os
+import random
+import zipfile
+from dataclasses import dataclass
+from pathlib import Path
+
+# -----------------------------------------------------------------------------
+# TreeSpec
+# Purpose: Shape of a synthetic directory tree for benchmarking FileScanner.
+# -----------------------------------------------------------------------------
+@dataclass
+class TreeSpec:
+    depth: int = 3                # folder levels below the root
+    fanout: int = 4               # sub-folders per folder
+    files_per_dir: int = 20       # files per folder (mix below)
+    text_kb: int = 8              # average size of text/code files
+    binary_ratio: float = 0.1     # share of known binary files (.png, .dll, ...)
+    unknown_ratio: float = 0.1    # share of files with unknown extensions
+    pdf_count: int = 20           # PDFs spread over the tree
+    docx_count: int = 20          # DOCX files spread over the tree
+    huge_logs: int = 1            # number of huge .log files in the root
+    huge_log_mb: int = 64         # size of each huge log
+    excluded_trees: int = 2       # node_modules-style folders per top-level folder
+    excluded_files: int = 200     # files inside each excluded tree
+    seed: int = 42
+
+
+TEXT_EXTENSIONS = ['.py', '.js', '.cs', '.json', '.md', '.txt', '.xml', '.yaml', '.html', '.css', '.sql']
+BINARY_EXTENSIONS = ['.png', '.dll', '.exe', '.zip', '.bin']
+UNKNOWN_EXTENSIONS = ['', '.dat2', '.cfgx', '.tmpl']
+WORDS = ("scanner folder content export token budget index shard encoding "
+         "project snapshot review module value result error config").split()
+
+
+# -----------------------------------------------------------------------------
+# _text
+# Purpose: Pseudo-random source-like text of roughly `size` bytes.
+# -----------------------------------------------------------------------------
+def _text(rng: random.Random, size: int) -> str:
+    lines = []
+    total = 0
+    while total < size:
+        line = "    " * rng.randint(0, 3) + " ".join(rng.choice(WORDS) for _ in range(rng.randint(3, 12)))
+        lines.append(line)
+        total += len(line) + 1
+    return "\n".join(lines) + "\n"
+
+
+# -----------------------------------------------------------------------------
+# write_pdf
+# Purpose: Minimal single-page PDF with extractable text (no dependencies).
+# -----------------------------------------------------------------------------
+def write_pdf(path: Path, text: str):
+    safe = text.replace('\\', '\\\\').replace('(', '\\(').replace(')', '\\)')
+    lines = safe.splitlines()[:40]
+    stream = "BT /F1 10 Tf 50 780 Td 12 TL " + " ".join(f"({line}) '" for line in lines) + " ET"
+    objects = [
+        "<< /Type /Catalog /Pages 2 0 R >>",
+        "<< /Type /Pages /Kids [3 0 R] /Count 1 >>",
+        "<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 842] "
+        "/Resources << /Font << /F1 5 0 R >> >> /Contents 4 0 R >>",
+        f"<< /Length {len(stream)} >>\nstream\n{stream}\nendstream",
+        "<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>",
+    ]
+    out = bytearray(b"%PDF-1.4\n")
+    offsets = []
+    for number, body in enumerate(objects, start=1):
+        offsets.append(len(out))
+        out += f"{number} 0 obj\n{body}\nendobj\n".encode('latin-1')
+    xref = len(out)
+    out += f"xref\n0 {len(objects) + 1}\n0000000000 65535 f \n".encode('latin-1')
+    for offset in offsets:
+        out += f"{offset:010d} 00000 n \n".encode('latin-1')
+    out += f"trailer\n<< /Size {len(objects) + 1} /Root 1 0 R >>\nstartxref\n{xref}\n%%EOF\n".encode('latin-1')
+    path.write_bytes(bytes(out))
+
+
+# -----------------------------------------------------------------------------
+# write_docx
+# Purpose: Minimal DOCX (word/document.xml with one paragraph per line).
+# -----------------------------------------------------------------------------
+def write_docx(path: Path, text: str):
+    paragraphs = "".join(
+        f"<w:p><w:r><w:t>{line}</w:t></w:r></w:p>" for line in text.splitlines()
+    )
+    document = (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+        '<w:document xmlns:w="http://schemas.openxmlformats.org/wordprocessingml/2006/main">'
+        f'<w:body>{paragraphs}</w:body></w:document>'
+    )
+    content_types = (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+        '<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">'
+        '<Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>'
+        '<Default Extension="xml" ContentType="application/xml"/>'
+        '<Override PartName="/word/document.xml" '
+        'ContentType="application/vnd.openxmlformats-officedocument.wordprocessingml.document.main+xml"/>'
+        '</Types>'
+    )
+    rels = (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+        '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+        '<Relationship Id="rId1" '
+        'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/officeDocument" '
+        'Target="word/document.xml"/>'
+        '</Relationships>'
+    )
+    with zipfile.ZipFile(path, 'w', zipfile.ZIP_DEFLATED) as z:
+        z.writestr('[Content_Types].xml', content_types)
+        z.writestr('_rels/.rels', rels)
+        z.writestr('word/document.xml', document)
+
+
+# -----------------------------------------------------------------------------
+# write_huge_log
+# Purpose: Write a large log file in 1 MB blocks without holding it in memory.
+# -----------------------------------------------------------------------------
+def write_huge_log(path: Path, size_mb: int, rng: random.Random):
+    block = "".join(
+        f"2026-01-01 12:00:{i % 60:02d} INFO {_text(rng, 80).strip()}\n" for i in range(2000)
+    ).encode('utf-8')
+    with open(path, 'wb') as f:
+        written = 0
+        while written < size_mb * 1024 * 1024:
+            f.write(block)
+            written += len(block)
+
+
+# -----------------------------------------------------------------------------
+# generate_tree
+# Purpose: Build the synthetic tree under `root` according to `spec`.
+# Returns: Counters describing what was written.
+# -----------------------------------------------------------------------------
+def generate_tree(root: Path, spec: TreeSpec) -> dict:
+    rng = random.Random(spec.seed)
+    root.mkdir(parents=True, exist_ok=True)
+    counts = {'folders': 0, 'files': 0, 'bytes': 0}
+
+    def add_file(path: Path):
+        counts['files'] += 1
+        counts['bytes'] += path.stat().st_size
+
+    folders = [root]
+    frontier = [root]
+    for level in range(spec.depth):
+        next_frontier = []
+        for folder in frontier:
+            for i in range(spec.fanout):
+                sub = folder / f"dir{level}_{i}"
+                sub.mkdir(exist_ok=True)
+                next_frontier.append(sub)
+        folders.extend(next_frontier)
+        frontier = next_frontier
+    counts['folders'] = len(folders)
+
+    for folder in folders:
+        for i in range(spec.files_per_dir):
+            roll = rng.random()
+            if roll < spec.binary_ratio:
+                path = folder / f"blob{i}{rng.choice(BINARY_EXTENSIONS)}"
+                path.write_bytes(os.urandom(rng.randint(1, 64) * 1024))
+            elif roll < spec.binary_ratio + spec.unknown_ratio:
+                path = folder / f"file{i}{rng.choice(UNKNOWN_EXTENSIONS)}"
+                if rng.random() < 0.5:
+                    path.write_text(_text(rng, spec.text_kb * 1024), encoding='utf-8')
+                else:
+                    path.write_bytes(os.urandom(spec.text_kb * 1024))
+            else:
+                path = folder / f"file{i}{rng.choice(TEXT_EXTENSIONS)}"
+                path.write_text(_text(rng, rng.randint(1, 2 * spec.text_kb) * 1024), encoding='utf-8')
+            add_file(path)
+
+    for i in range(spec.pdf_count):
+        path = rng.choice(folders) / f"doc{i}.pdf"
+        write_pdf(path, _text(rng, 2048))
+        add_file(path)
+
+    for i in range(spec.docx_count):
+        path = rng.choice(folders) / f"doc{i}.docx"
+        write_docx(path, _text(rng, 4096))
+        add_file(path)
+
+    for i in range(spec.huge_logs):
+        path = root / f"huge{i}.log"
+        write_huge_log(path, spec.huge_log_mb, rng)
+        add_file(path)
+
+    top_level = folders[1:1 + spec.fanout] or [root]
+    for folder in top_level:
+        for t in range(spec.excluded_trees):
+            excluded = folder / ("node_modules" if t % 2 == 0 else "build") / f"pkg{t}" / "lib"
+            excluded.mkdir(parents=True, exist_ok=True)
+            for i in range(spec.excluded_files):
+                path = excluded / f"mod{i}.js"
+                path.write_text(_text(rng, 1024), encoding='utf-8')
+                add_file(path)
+
+    return counts
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Generate a synthetic tree for Dir2CSV benchmarks.")
+    parser.add_argument("root", help="Target folder (created if missing)")
+    for name, value in vars(TreeSpec()).items():
+        parser.add_argument(f"--{name.replace('_', '-')}", type=type(value), default=value)
+    args = parser.parse_args(argv)
+    spec = TreeSpec(**{k: v for k, v in vars(args).items() if k != 'root'})
+    counts = generate_tree(Path(args.root), spec)
+    print(f"Generated {counts['files']} files in {counts['folders']} folders ({counts['bytes'] / 1e6:.1f} MB)")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
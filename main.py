@@ -5,8 +5,13 @@ import json
 from pathlib import Path
 import sys
 import os
+import multiprocessing
+import logging
+import queue
+import threading
+import time
 
-from Dir2CSV import FileScanner  # translated class name
+from Dir2CSV import FileScanner, own_output_paths  # translated class name
 
 # -----------------------------------------------------------------------------
 # main
@@ -44,28 +49,71 @@ def main():
 
     # -------------------------------------------------------------------------
     # start_scan
-    # Purpose: Trigger the scan using FileScanner and write results to CSV.
-    #          Show user feedback dialogs for success and errors.
+    # Purpose: Run the scan -> CSV export on a background thread so the window
+    #          stays responsive. Progress and the outcome are posted to
+    #          `events`, which the Tk loop polls via after().
     # -------------------------------------------------------------------------
-    def start_scan(folder, csv_file):
-        scanner = FileScanner()
-        try:
-            found = scanner.scan_folder(folder)
-            scanner.create_csv(found, csv_file)
-            messagebox.showinfo("Done!", f"Scan finished.\nFile saved to:\n{csv_file}")
-        except PermissionError:
-            messagebox.showerror("Error", f"No write access to:\n{csv_file}")
-            show_ui()
-        except Exception as e:
-            messagebox.showerror("Error", f"An error occurred during scanning:\n{e}")
-            show_ui()
+    def start_scan(scanner, folder, csv_file, events):
+        def progress(info):
+            events.put(("progress", info["relative_path"], info.get("size") or 0))
+
+        def run():
+            scanner.progress_callback = progress
+            try:
+                events.put(("counting",))
+                scanner.skip_paths = own_output_paths(csv_file)  # count what the writer will list
+                total_files, total_bytes = scanner.count_files(folder)
+                if scanner.cancelled:
+                    # Cancelled while counting: nothing was written
+                    events.put(("cancelled", 0))
+                    return
+                events.put(("total", total_files, total_bytes))
+                count = scanner.write_output(scanner.iter_scan(folder), csv_file)
+                events.put(("cancelled" if scanner.cancelled else "done", count))
+            except PermissionError:
+                events.put(("error", f"No write access to:\n{csv_file}"))
+            except Exception as e:
+                events.put(("error", f"An error occurred during scanning:\n{e}"))
+
+        worker = threading.Thread(target=run, name="dir2csv-scan", daemon=True)
+        worker.start()
+        return worker
+
+    # -------------------------------------------------------------------------
+    # format_duration
+    # Purpose: Render seconds as m:ss or h:mm:ss for the ETA display.
+    # -------------------------------------------------------------------------
+    def format_duration(seconds):
+        seconds = int(max(0, seconds))
+        hours, rest = divmod(seconds, 3600)
+        minutes, secs = divmod(rest, 60)
+        return f"{hours}:{minutes:02d}:{secs:02d}" if hours else f"{minutes}:{secs:02d}"
 
     # -------------------------------------------------------------------------
     # show_ui
-    # Purpose: Build and display the main Tkinter window to configure inputs.
+    # Purpose: Build and display the main Tkinter window to configure inputs
+    #          and follow a running scan (progress, throughput, cancel).
     # -------------------------------------------------------------------------
     def show_ui():
         saved = load_saved_values()
+        events = queue.Queue()
+        scan = {"scanner": None, "files": 0, "bytes": 0, "current": "",
+                "total_files": 0, "total_bytes": 0, "started": None, "csv": ""}
+
+        # ---------------------------------------------------------------------
+        # set_running
+        # Purpose: Lock the inputs while a scan runs; Exit becomes Cancel.
+        # ---------------------------------------------------------------------
+        def set_running(running):
+            state = "disabled" if running else "normal"
+            for widget in (entry_folder, entry_csv, button_folder, button_csv, check_save, button_ok):
+                widget.configure(state=state)
+            button_exit.configure(text="Cancel" if running else "Exit", state="normal")
+            if not running:
+                progress_bar.stop()
+                progress_bar.configure(mode="determinate", value=0)
+                label_status.configure(text="")
+                label_current.configure(text="")
 
         # ---------------------------------------------------------------------
         # on_ok
@@ -77,18 +125,99 @@ def main():
             if not folder or not csv_path:
                 messagebox.showwarning("Missing input", "Please fill in all fields.")
                 return
-            window.destroy()
             if var_save.get():
                 save_values(folder, csv_path)
-            start_scan(folder, csv_path)
+
+            # A fresh scanner per run, so no cancel request carries over
+            scan.update(scanner=FileScanner(), files=0, bytes=0, current="",
+                        total_files=0, total_bytes=0, started=None, csv=csv_path)
+            set_running(True)
+            start_scan(scan["scanner"], folder, csv_path, events)
+            window.after(100, poll_events)
 
         # ---------------------------------------------------------------------
         # on_exit
-        # Purpose: Close the configuration window without running a scan.
+        # Purpose: Close the window, or cancel the scan if one is running
+        #          (the partial CSV is still written and valid).
         # ---------------------------------------------------------------------
         def on_exit():
+            if scan["scanner"] is not None:
+                scan["scanner"].cancel()
+                button_exit.configure(state="disabled")
+                label_status.configure(text="Cancelling...")
+                return
             window.destroy()
 
+        # ---------------------------------------------------------------------
+        # poll_events
+        # Purpose: Drain the worker's event queue and refresh the progress UI.
+        # ---------------------------------------------------------------------
+        def poll_events():
+            try:
+                while True:
+                    event = events.get_nowait()
+                    kind = event[0]
+                    if kind == "progress":
+                        scan["files"] += 1
+                        scan["bytes"] += event[2]
+                        scan["current"] = event[1]
+                    elif kind == "counting":
+                        progress_bar.configure(mode="indeterminate")
+                        progress_bar.start(15)
+                        label_status.configure(text="Counting files...")
+                    elif kind == "total":
+                        progress_bar.stop()
+                        progress_bar.configure(mode="determinate", maximum=max(event[1], 1), value=0)
+                        scan["total_files"], scan["total_bytes"] = event[1], event[2]
+                        scan["started"] = time.monotonic()
+                    else:
+                        finish_scan(event)
+                        return
+            except queue.Empty:
+                pass
+
+            if scan["started"] is not None:
+                elapsed = max(time.monotonic() - scan["started"], 1e-6)
+                files_per_s = scan["files"] / elapsed
+                mb_per_s = scan["bytes"] / elapsed / 1e6
+                if scan["total_bytes"] and scan["bytes"]:
+                    remaining = (scan["total_bytes"] - scan["bytes"]) / (scan["bytes"] / elapsed)
+                elif files_per_s:
+                    remaining = (scan["total_files"] - scan["files"]) / files_per_s
+                else:
+                    remaining = 0
+                progress_bar.configure(value=scan["files"])
+                label_status.configure(
+                    text=f"{scan['files']} / {scan['total_files']} files   "
+                         f"{files_per_s:.0f} files/s   {mb_per_s:.1f} MB/s   "
+                         f"ETA {format_duration(remaining)}"
+                )
+                current = scan["current"]
+                label_current.configure(text=current if len(current) <= 80 else "..." + current[-77:])
+
+            window.after(100, poll_events)
+
+        # ---------------------------------------------------------------------
+        # finish_scan
+        # Purpose: Report the outcome; close on success, re-enable the form
+        #          after a cancel or an error.
+        # ---------------------------------------------------------------------
+        def finish_scan(event):
+            kind = event[0]
+            scan["scanner"] = None
+            csv_file = scan["csv"]
+            if kind == "done":
+                messagebox.showinfo("Done!", f"Scan finished.\nFile saved to:\n{csv_file}")
+                window.destroy()
+                return
+            set_running(False)
+            if kind == "cancelled" and not event[1]:
+                messagebox.showinfo("Cancelled", "Scan cancelled. No file was written.")
+            elif kind == "cancelled":
+                messagebox.showinfo("Cancelled", f"Scan cancelled after {event[1]} files.\nPartial file saved to:\n{csv_file}")
+            else:
+                messagebox.showerror("Error", event[1])
+
         # ---------------------------------------------------------------------
         # choose_folder
         # Purpose: Let the user pick the folder to scan.
@@ -104,7 +233,7 @@ def main():
         # Purpose: Let the user choose where to save the CSV file.
         # ---------------------------------------------------------------------
         def choose_file():
-            path = filedialog.asksaveasfilename(defaultextension=".csv", filetypes=[("CSV files", "*.csv")])
+            path = filedialog.asksaveasfilename(defaultextension=".csv", filetypes=[("CSV files", "*.csv"), ("Compressed CSV", "*.csv.gz *.csv.xz *.zip"), ("SQLite database", "*.sqlite")])
             if path:
                 entry_csv.delete(0, tk.END)
                 entry_csv.insert(0, path)
@@ -127,6 +256,7 @@ def main():
         style.configure("TButton", background="#A569BD", foreground="white", font=("Segoe UI", 10), padding=6)
         style.map("TButton", background=[("active", "#BA55D3")])
         style.configure("TLabel", background="#8E44AD", foreground="white", font=("Segoe UI", 10, "bold"))
+        style.configure("Status.TLabel", background="#8E44AD", foreground="white", font=("Segoe UI", 9))
         style.configure("TCheckbutton", background="#8E44AD", foreground="white", font=("Segoe UI", 10))
         style.map("TCheckbutton", background=[("active", "#8E44AD")])
 
@@ -135,18 +265,33 @@ def main():
         ttk.Label(window, text="Folder to scan:").grid(row=0, column=0, sticky="w", **padding)
         entry_folder = ttk.Entry(window, width=60)
         entry_folder.grid(row=0, column=1, **padding)
-        ttk.Button(window, text="Browse", command=choose_folder).grid(row=0, column=2, **padding)
+        button_folder = ttk.Button(window, text="Browse", command=choose_folder)
+        button_folder.grid(row=0, column=2, **padding)
 
         ttk.Label(window, text="CSV output file:").grid(row=1, column=0, sticky="w", **padding)
         entry_csv = ttk.Entry(window, width=60)
         entry_csv.grid(row=1, column=1, **padding)
-        ttk.Button(window, text="Browse", command=choose_file).grid(row=1, column=2, **padding)
+        button_csv = ttk.Button(window, text="Browse", command=choose_file)
+        button_csv.grid(row=1, column=2, **padding)
 
         var_save = tk.BooleanVar(value=True)
-        ttk.Checkbutton(window, text="Save inputs", variable=var_save).grid(row=2, column=1, **padding)
+        check_save = ttk.Checkbutton(window, text="Save inputs", variable=var_save)
+        check_save.grid(row=2, column=1, **padding)
+
+        button_ok = ttk.Button(window, text="OK", command=on_ok)
+        button_ok.grid(row=3, column=1, sticky="e", **padding)
+        button_exit = ttk.Button(window, text="Exit", command=on_exit)
+        button_exit.grid(row=3, column=2, sticky="w", **padding)
+
+        # Progress area (filled while a scan runs)
+        progress_bar = ttk.Progressbar(window, orient="horizontal", mode="determinate")
+        progress_bar.grid(row=4, column=0, columnspan=3, sticky="ew", **padding)
+        label_status = ttk.Label(window, text="", style="Status.TLabel")
+        label_status.grid(row=5, column=0, columnspan=3, sticky="w", padx=10)
+        label_current = ttk.Label(window, text="", style="Status.TLabel")
+        label_current.grid(row=6, column=0, columnspan=3, sticky="w", padx=10, pady=(0, 8))
 
-        ttk.Button(window, text="OK", command=on_ok).grid(row=3, column=1, sticky="e", **padding)
-        ttk.Button(window, text="Exit", command=on_exit).grid(row=3, column=2, sticky="w", **padding)
+        window.protocol("WM_DELETE_WINDOW", on_exit)
 
         # Pre-fill with saved values (supports old keys via load_saved_values)
         entry_folder.insert(0, saved.get("folder", ""))
@@ -161,4 +306,6 @@ def main():
 # Entry point
 # -----------------------------------------------------------------------------
 if __name__ == "__main__":
+    multiprocessing.freeze_support()  # required for the process pool in frozen .exe builds
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
     main()
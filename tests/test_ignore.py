@@ -0,0 +1,92 @@
+import shutil
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from Dir2CSV import FileScanner, IgnoreRules
+
+# (name, {ignore file: content}, files in the tree)
+GITIGNORE_CASES = [
+    ('nested files', {'.gitignore': '*.log\n'},
+     ['a.log', 'keep.txt', 'sub/b.log', 'sub/deep/c.log', 'sub/deep/d.txt']),
+    ('! re-includes', {'.gitignore': '*.log\n!keep.log\n'},
+     ['x.log', 'keep.log', 'sub/keep.log', 'sub/y.log']),
+    ('dir/ rules', {'.gitignore': 'tmp/\n'},
+     ['tmp/a.txt', 'sub/tmp/b.txt', 'other/tmp', 'tmpfile.txt']),
+    ('/anchored', {'.gitignore': '/root.txt\n'},
+     ['root.txt', 'sub/root.txt']),
+    ('slash in the middle anchors', {'.gitignore': 'docs/*.md\n'},
+     ['docs/a.md', 'docs/sub/b.md', 'x/docs/c.md', 'docs/c.txt']),
+    ('a/**/b', {'.gitignore': 'a/**/b\n'},
+     ['a/b', 'a/x/b', 'a/x/y/b', 'c/a/b', 'a/bb']),
+    ('leading **/ and trailing /**', {'.gitignore': '**/cache\nlogs/**\n'},
+     ['cache/x.txt', 'sub/cache/y.txt', 'logs/a.txt', 'logs/deep/b.txt', 'sub/logs/c.txt']),
+    ('character classes', {'.gitignore': '[!a]*.txt\nfile[0-9].c\n'},
+     ['a1.txt', 'b1.txt', 'file1.c', 'filex.c']),
+    ('escapes and trailing spaces', {'.gitignore': '\\#hash\n\\!bang\nspaced.txt   \n'},
+     ['#hash', '!bang', 'spaced.txt', 'other.txt']),
+    ('deeper ignore files win', {'.gitignore': '*.txt\n', 'sub/.gitignore': '!keep.txt\n'},
+     ['keep.txt', 'sub/keep.txt', 'sub/other.txt']),
+    ('no re-include inside an ignored folder', {'.gitignore': 'ex/\n!ex/in.txt\n'},
+     ['ex/in.txt', 'ex/out.txt', 'in.txt']),
+    ('comments and blank lines', {'.gitignore': '# *.txt\n\n*.tmp\n'},
+     ['a.txt', 'b.tmp']),
+]
+
+
+def _make_tree(root: Path, ignore_files: dict, files: list):
+    for rel in files:
+        path = root / rel
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(rel, encoding='utf-8')
+    for rel, content in ignore_files.items():
+        path = root / rel
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(content, encoding='utf-8')
+
+
+def _walked(root: Path) -> set:
+    scanner = FileScanner(prune_excluded_folders=True, respect_ignore_files=True)
+    scanner.start_path = root.resolve()
+    return {p.relative_to(scanner.start_path).as_posix() for p, _, _ in scanner.walk_files(scanner.start_path)}
+
+
+@pytest.mark.skipif(shutil.which('git') is None, reason="git not installed")
+@pytest.mark.parametrize('name, ignore_files, files', GITIGNORE_CASES, ids=[c[0] for c in GITIGNORE_CASES])
+def test_walk_lists_what_git_does_not_ignore(tmp_path, name, ignore_files, files):
+    root = tmp_path / 'repo'
+    root.mkdir()
+    _make_tree(root, ignore_files, files)
+    subprocess.run(['git', 'init', '-q'], cwd=root, check=True)
+    listed = subprocess.run(
+        ['git', '-c', 'core.excludesFile=', 'ls-files', '--others', '--exclude-standard'],
+        cwd=root, check=True, capture_output=True, text=True
+    ).stdout.splitlines()
+
+    assert _walked(root) == set(listed)
+
+
+# .dockerignore: patterns are relative to the context root at any depth
+# (no implicit **/), and only the root's file counts
+def test_dockerignore_is_anchored_at_the_root(tmp_path):
+    _make_tree(tmp_path, {'.dockerignore': '*.md\nbuildinfo\n', 'sub/.dockerignore': '*.txt\n'},
+               ['a.md', 'sub/b.md', 'buildinfo', 'sub/buildinfo', 'sub/c.txt'])
+    assert _walked(tmp_path) == {'.dockerignore', 'sub/.dockerignore', 'sub/b.md', 'sub/buildinfo', 'sub/c.txt'}
+
+
+@pytest.mark.parametrize('lines, path, is_dir, verdict', [
+    (['*.log'], 'a/b.log', False, True),
+    (['*.log', '!b.log'], 'a/b.log', False, False),
+    (['tmp/'], 'tmp', False, None),
+    (['tmp/'], 'tmp', True, True),
+    (['/x'], 'a/x', False, None),
+    (['a/**/b'], 'a/b', False, True),
+    (['a/**/b'], 'a/x/y/b', False, True),
+    (['foo'], 'bar', False, None),
+])
+def test_ignore_rules_match(lines, path, is_dir, verdict):
+    assert IgnoreRules(lines).match(path, is_dir) is verdict
@@ -0,0 +1,67 @@
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from Dir2CSV import FileScanner, walk_key
+
+# Names chosen so that name order, file/folder order and depth disagree
+FILES = [
+    'z.txt', 'a.txt', 'B.txt', 'a b.txt', 'ä.txt',
+    'a/z.txt', 'a/a/x.txt', 'a/b.txt', 'a.d/x.txt', 'a-b/x.txt',
+    'm/n/o/p.txt', 'm/q.txt', 'm/n/r.txt', 'Z/y.txt',
+]
+
+
+@pytest.fixture
+def tree(tmp_path):
+    root = tmp_path / 'root'
+    for rel in FILES:
+        path = root / rel
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(f"content of {rel}\n", encoding='utf-8')
+    return root
+
+
+def _walk(root: Path, resume_key=None) -> list:
+    scanner = FileScanner()
+    start = root.resolve()
+    return [p.relative_to(start).parts for p, _, _ in scanner.walk_files(start, resume_key)]
+
+
+def test_walk_key_sorts_like_the_walk(tree):
+    walked = _walk(tree)
+    assert sorted(walked) != walked  # plain path order is not walk order
+    assert sorted(walked, key=walk_key) == walked
+
+
+def test_resume_key_continues_right_after_each_file(tree):
+    walked = _walk(tree)
+    for i, parts in enumerate(walked):
+        assert _walk(tree, walk_key(parts)) == walked[i + 1:]
+
+
+@pytest.mark.parametrize('stop_after', [1, 5, len(FILES) - 1])
+def test_resumed_checkpointed_csv_matches_an_uninterrupted_run(tmp_path, tree, stop_after):
+    expected = tmp_path / 'full.csv'
+    FileScanner().write_checkpointed([str(tree)], str(expected))
+
+    out = tmp_path / 'out.csv'
+    scanner = FileScanner()
+    seen = []
+
+    def progress(info):
+        seen.append(info)
+        if len(seen) == stop_after:
+            scanner.cancel()
+
+    scanner.progress_callback = progress
+    scanner.write_checkpointed([str(tree)], str(out), interval=0)
+    assert Path(str(out) + '.checkpoint.json').exists()
+    assert out.read_bytes() != expected.read_bytes()
+
+    FileScanner().write_checkpointed([str(tree)], str(out), resume=True)
+    assert out.read_bytes() == expected.read_bytes()
+    assert not Path(str(out) + '.checkpoint.json').exists()
@@ -0,0 +1,34 @@
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from Dir2CSV import FileScanner
+
+MIB = 1024 * 1024
+
+
+def _big_unknown_file(tmp_path, size):
+    path = tmp_path / 'data.unknownext'
+    line = b'some log line of text\n'
+    with open(path, 'wb') as f:
+        f.write(line * (size // len(line) + 1))
+    return path
+
+
+def test_unknown_file_between_probe_limit_and_threshold_is_skipped(tmp_path):
+    path = _big_unknown_file(tmp_path, 12 * MIB)
+    scanner = FileScanner(sample_threshold=100 * MIB)
+    assert not scanner.should_check_file(path)
+
+
+def test_unknown_file_above_threshold_is_sampled(tmp_path):
+    path = _big_unknown_file(tmp_path, 12 * MIB)
+    scanner = FileScanner(sample_threshold=11 * MIB)
+    assert scanner.should_check_file(path)
+    assert len(scanner.read_file_intelligently(path)) < MIB
+
+
+def test_unknown_file_above_probe_limit_is_skipped_without_sampling(tmp_path):
+    path = _big_unknown_file(tmp_path, 12 * MIB)
+    assert not FileScanner().should_check_file(path)
@@ -0,0 +1,44 @@
+import csv
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from Dir2CSV import ShardedCSVWriter, _csv_safe
+
+
+def _row(path: str, content: str) -> dict:
+    return {'relative_path': path, 'content': content}
+
+
+def _read_rows(path: Path) -> list:
+    with open(path, newline='', encoding='utf-8-sig') as f:
+        return list(csv.DictReader(f))
+
+
+def test_row_over_budget_on_its_own_is_written_unsplit(tmp_path):
+    out = tmp_path / 'scan.csv'
+    row = _row('some/deeply/nested/folder/with/a/long/name.txt', 'hello world')
+    with ShardedCSVWriter(str(out), max_shard_bytes=40, columns=['relative_path', 'content']) as writer:
+        writer.write(row)
+
+    assert writer.shard_count == 1
+    rows = _read_rows(tmp_path / 'scan.part001.csv')
+    assert [r['content'] for r in rows] == ['hello world']
+
+
+def test_long_content_is_split_and_reassembles(tmp_path):
+    out = tmp_path / 'scan.csv'
+    content = ''.join('line %d\n' % i for i in range(200))
+    with ShardedCSVWriter(str(out), max_shard_bytes=300, columns=['relative_path', 'content']) as writer:
+        writer.write(_row('a.txt', content))
+
+    assert writer.shard_count > 1
+    pieces = []
+    for n in range(1, writer.shard_count + 1):
+        rows = _read_rows(tmp_path / ('scan.part%03d.csv' % n))
+        assert len(rows) == 1
+        pieces.append(rows[0]['content'])
+    joined = ''.join(p.replace(ShardedCSVWriter.CONTINUED_FROM, '').replace(ShardedCSVWriter.CONTINUED_IN, '')
+                     for p in pieces)
+    assert joined == _csv_safe(content)
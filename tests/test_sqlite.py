@@ -0,0 +1,35 @@
+import csv
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from Dir2CSV import FileScanner, query_sqlite
+
+
+def test_words_at_line_start_and_after_tab_are_searchable(tmp_path):
+    root = tmp_path / 'docs'
+    root.mkdir()
+    (root / 'notes.txt').write_text('alpha beta\ngamma delta\n\tepsilon "quoted"\n', encoding='utf-8')
+    db = tmp_path / 'scan.sqlite'
+
+    scanner = FileScanner()
+    scanner.write_sqlite(scanner.iter_scan(str(root)), str(db))
+
+    assert [path for path, _ in query_sqlite(str(db), 'gamma')] == [str(Path('docs/notes.txt'))]
+    assert [path for path, _ in query_sqlite(str(db), 'epsilon')] == [str(Path('docs/notes.txt'))]
+    assert query_sqlite(str(db), 'ngamma') == []
+
+
+def test_csv_output_keeps_escaped_content(tmp_path):
+    root = tmp_path / 'docs'
+    root.mkdir()
+    (root / 'notes.txt').write_text('a "b"\n\tc\n', encoding='utf-8')
+    out = tmp_path / 'scan.csv'
+
+    scanner = FileScanner()
+    scanner.write_csv(scanner.iter_scan(str(root)), str(out))
+
+    with open(out, newline='', encoding='utf-8-sig') as f:
+        rows = list(csv.DictReader(f))
+    assert rows[0]['content'] == 'a ""b""\\n\\tc\\n'
@@ -0,0 +1,49 @@
+import multiprocessing
+import sys
+import time
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from Dir2CSV import EXPENSIVE, ExtractorRegistry, FileScanner
+
+
+def spin(scanner, source):
+    while True:
+        pass
+
+
+def echo(scanner, source):
+    return Path(source).read_text(encoding='utf-8')
+
+
+@pytest.mark.parametrize('workers', [1, 2])
+def test_stuck_extraction_is_killed_and_the_scan_goes_on(tmp_path, workers):
+    root = tmp_path / 'docs'
+    root.mkdir()
+    (root / 'a.stuck').write_text('never read', encoding='utf-8')
+    (root / 'b.fast').write_text('fast text', encoding='utf-8')
+    (root / 'c.stuck').write_text('never read', encoding='utf-8')
+    (root / 'd.fast').write_text('more text', encoding='utf-8')
+
+    scanner = FileScanner(workers=workers, extraction_timeout=1.0)
+    scanner.extractors = ExtractorRegistry(load_entry_points=False)
+    scanner.extractors.register(['.stuck'], spin, cost=EXPENSIVE)
+    scanner.extractors.register(['.fast'], echo, cost=EXPENSIVE)
+    scanner.target_extensions |= {'.stuck', '.fast'}
+
+    t0 = time.monotonic()
+    rows = {Path(r['relative_path']).name: r['content'] for r in scanner.iter_scan(str(root))}
+    assert time.monotonic() - t0 < 30
+
+    assert rows['a.stuck'].startswith('[STUCK extraction timed out after 1.0s')
+    assert rows['c.stuck'].startswith('[STUCK extraction timed out after 1.0s')
+    assert rows['b.fast'] == 'fast text'
+    assert rows['d.fast'] == 'more text'
+    # Nothing keeps spinning: no leftover thread here, no live helper process
+    cpu = time.process_time()
+    time.sleep(0.5)
+    assert time.process_time() - cpu < 0.2
+    assert not any(p.is_alive() for p in multiprocessing.active_children())
@@ -0,0 +1,93 @@
+import io
+import sys
+import zipfile
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from Dir2CSV import FileScanner, update_csv
+
+
+def _write(path: Path, text: str):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(text, encoding='utf-8')
+
+
+def _zip(path: Path, members: dict):
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, 'w') as archive:
+        for name, text in members.items():
+            archive.writestr(name, text)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_bytes(buffer.getvalue())
+
+
+@pytest.fixture
+def tree(tmp_path):
+    root = tmp_path / 'root'
+    for rel in ['a.txt', 'm.txt', 'z.txt', 'b/x.txt', 'b/y.txt', 'b/c/d.txt', 'e/f.txt', 'old/gone.txt']:
+        _write(root / rel, f"{rel}\nline two\n")
+    _zip(root / 'b/pack.zip', {'in/one.txt': 'one', 'two.txt': 'two'})
+    return root
+
+
+# Each edit changes the tree and returns the paths watch mode would report
+def change_file(root):
+    _write(root / 'm.txt', 'changed\n\t"quoted"')
+    return [root / 'm.txt']
+
+
+def add_file_in_the_middle(root):
+    _write(root / 'b/xa.txt', 'new')
+    return [root / 'b/xa.txt']
+
+
+def delete_file(root):
+    (root / 'b/y.txt').unlink()
+    return [root / 'b/y.txt']
+
+
+def add_folder(root):
+    _write(root / 'd/new/n.txt', 'n')
+    _write(root / 'd/o.txt', 'o')
+    return [root / 'd']
+
+
+def delete_folder(root):
+    (root / 'old/gone.txt').unlink()
+    (root / 'old').rmdir()
+    return [root / 'old']
+
+
+def change_archive(root):
+    _zip(root / 'b/pack.zip', {'two.txt': '2', 'zz.txt': 'z'})
+    return [root / 'b/pack.zip']
+
+
+def add_first_and_last_file(root):
+    _write(root / '0.txt', '0')
+    _write(root / 'e/z.txt', 'z')
+    return [root / '0.txt', root / 'e/z.txt']
+
+
+EDITS = [change_file, add_file_in_the_middle, delete_file, add_folder, delete_folder,
+         change_archive, add_first_and_last_file]
+
+
+@pytest.mark.parametrize('edit', EDITS, ids=[e.__name__ for e in EDITS])
+def test_update_matches_a_full_rescan(tmp_path, tree, edit):
+    out = tmp_path / 'out.csv'
+    scanner = FileScanner(scan_archives=True)
+    scanner.write_csv(scanner.iter_scan(str(tree)), str(out))
+    scanner._watch_rules = {}
+
+    touched = edit(tree)
+    updates, removed = scanner._collect_changes(set(touched))
+    update_csv(str(out), scanner.csv_columns(), updates, removed)
+
+    expected = tmp_path / 'expected.csv'
+    fresh = FileScanner(scan_archives=True)
+    fresh.write_csv(fresh.iter_scan(str(tree)), str(expected))
+    assert out.read_text(encoding='utf-8-sig') == expected.read_text(encoding='utf-8-sig')
@@ -0,0 +1,56 @@
+import csv
+import sys
+import threading
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from Dir2CSV import FileScanner
+
+
+def _contents(out: Path) -> dict:
+    try:
+        with open(out, newline='', encoding='utf-8-sig') as f:
+            return {row['relative_path']: row['content'] for row in csv.DictReader(f)}
+    except FileNotFoundError:
+        return {}
+
+
+def _wait_for(predicate, timeout=15.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if predicate():
+            return True
+        time.sleep(0.05)
+    return False
+
+
+def test_folder_unignored_by_rescan_is_watched(tmp_path):
+    root = tmp_path / 'src'
+    (root / 'gen').mkdir(parents=True)
+    (root / '.gitignore').write_text('gen/\n', encoding='utf-8')
+    (root / 'a.txt').write_text('a', encoding='utf-8')
+    (root / 'gen' / 'g.txt').write_text('old', encoding='utf-8')
+    out = tmp_path / 'out.csv'
+    gen_file = str(Path('src/gen/g.txt'))
+
+    scanner = FileScanner(respect_ignore_files=True)
+    worker = threading.Thread(target=scanner.watch, args=(str(root), str(out)),
+                              kwargs={'debounce': 0.2, 'poll_interval': 0.2}, daemon=True)
+    worker.start()
+    try:
+        assert _wait_for(lambda: str(Path('src/a.txt')) in _contents(out))
+        assert gen_file not in _contents(out)
+
+        time.sleep(0.3)
+        (root / '.gitignore').write_text('', encoding='utf-8')
+        assert _wait_for(lambda: _contents(out).get(gen_file) == 'old')
+
+        time.sleep(0.3)
+        (root / 'gen' / 'g.txt').write_text('new', encoding='utf-8')
+        assert _wait_for(lambda: _contents(out).get(gen_file) == 'new')
+    finally:
+        scanner.cancel()
+        worker.join(10)
+    assert not worker.is_alive()